@@ -0,0 +1 @@
+"""Offline benchmarks for the Gimdow Lock integration."""
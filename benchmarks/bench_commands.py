@@ -0,0 +1,73 @@
+"""Benchmark lock and unlock commands."""
+
+from __future__ import annotations
+
+import time
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.components.lock import DOMAIN as LOCK_DOMAIN, SERVICE_UNLOCK
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import async_get_platforms
+
+from custom_components.gimdow.const import DOMAIN
+from custom_components.gimdow.gimdow import GimdowLock
+
+from .conftest import BenchRecorder
+from .fake_cloud import FakeCloud
+
+ROUNDS = 20
+
+
+def get_lock(hass: HomeAssistant) -> GimdowLock:
+    """Return the first lock entity of the integration."""
+    for platform in async_get_platforms(hass, DOMAIN):
+        if platform.domain == LOCK_DOMAIN:
+            return next(iter(platform.entities.values()))
+    raise AssertionError("No Gimdow lock set up")
+
+
+async def bench_send_command(
+    hass: HomeAssistant,
+    fake_cloud: FakeCloud,
+    setup_integration: MockConfigEntry,
+    bench: BenchRecorder,
+) -> None:
+    """Send commands with and without a pre-fetched password ticket."""
+    lock = get_lock(hass)
+    tickets = setup_integration.runtime_data.tickets
+
+    # Prefetching is not part of the command path, only time the command
+    durations = []
+    for _ in range(ROUNDS):
+        await tickets.async_prefetch(lock._device_id)
+        start = time.perf_counter()
+        assert await lock._async_send_command(False)
+        durations.append(time.perf_counter() - start)
+    bench.record("cached_ticket", mean=sum(durations) / ROUNDS, max=max(durations))
+
+    async def send_without_ticket() -> None:
+        tickets.take(lock._device_id)
+        assert await lock._async_send_command(False)
+
+    await bench.measure("fresh_ticket", send_without_ticket, ROUNDS)
+    await hass.async_block_till_done()
+
+
+async def bench_unlock_service(
+    hass: HomeAssistant,
+    fake_cloud: FakeCloud,
+    setup_integration: MockConfigEntry,
+    bench: BenchRecorder,
+) -> None:
+    """Unlock through the service call, including the command queue."""
+    lock = get_lock(hass)
+
+    async def unlock() -> None:
+        await hass.services.async_call(
+            LOCK_DOMAIN, SERVICE_UNLOCK, {ATTR_ENTITY_ID: lock.entity_id}, blocking=True
+        )
+
+    await bench.measure("service", unlock, ROUNDS)
+    await hass.async_block_till_done()
@@ -0,0 +1,48 @@
+"""Benchmark importing the integration as Home Assistant does at startup."""
+
+from __future__ import annotations
+
+from pathlib import Path
+import subprocess
+import sys
+
+from .conftest import BenchRecorder
+
+ROOT = Path(__file__).parent.parent
+
+# Modules loaded while bootstrapping, the SDK is only needed by a config entry
+MODULES = (
+    "custom_components.gimdow",
+    "custom_components.gimdow.config_flow",
+    "custom_components.gimdow.lock",
+    "custom_components.gimdow.sensor",
+)
+
+
+def import_times(module: str) -> dict[str, float]:
+    """Import a module in a fresh interpreter and return the cumulative times."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    times: dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1_000_000
+    return times
+
+
+def bench_import(bench: BenchRecorder) -> None:
+    """Import the integration modules without importing the SDK."""
+    for module in MODULES:
+        times = import_times(module)
+        assert "tuya_sharing" not in times, f"{module} imports the SDK"
+        bench.record(module, mean=times[module])
+    bench.record("sdk", mean=import_times("tuya_sharing")["tuya_sharing"])
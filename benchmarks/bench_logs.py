@@ -0,0 +1,53 @@
+"""Benchmark fetching and reducing large lock log pages."""
+
+from __future__ import annotations
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.gimdow.logs import LockLogReducer
+
+from .conftest import BenchRecorder
+from .fake_cloud import FakeCloud, FakeCloudConfig
+
+ROUNDS = 10
+
+
+@pytest.fixture(params=[100, 1_000, 10_000])
+def cloud_config(request: pytest.FixtureRequest) -> FakeCloudConfig:
+    """Run the log benchmarks for several log volumes."""
+    return FakeCloudConfig(devices=1, latency=0.0, log_volume=request.param)
+
+
+async def bench_fetch_and_reduce_logs(
+    hass: HomeAssistant,
+    fake_cloud: FakeCloud,
+    setup_integration: MockConfigEntry,
+    bench: BenchRecorder,
+) -> None:
+    """Stream a full log window into the reducer and poll a lock from its logs."""
+    coordinator = setup_integration.runtime_data.coordinator
+    device_id = fake_cloud.device_ids[0]
+
+    async def fetch() -> None:
+        assert await coordinator._async_fetch_device_logs(device_id, None) is not None
+
+    await bench.measure("fetch", fetch, ROUNDS)
+
+    logs = fake_cloud.logs[device_id]
+
+    def reduce() -> None:
+        LockLogReducer(None).feed(logs)
+
+    bench.measure_sync("reduce", reduce, ROUNDS)
+
+    async def update() -> None:
+        # Make the lock due for a cold log poll again
+        state = coordinator.get_state(device_id)
+        state.last_timestamp = state.status_updated = state.next_poll = None
+        assert await coordinator._async_update_lock(device_id)
+
+    await bench.measure("update", update, ROUNDS)
+    await hass.async_block_till_done()
@@ -0,0 +1,60 @@
+"""Benchmark applying bursts of status updates pushed over MQ."""
+
+from __future__ import annotations
+
+from collections.abc import Collection
+from datetime import timedelta
+import time
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.gimdow.const import MQ_UPDATE_COALESCE_WINDOW
+
+from .conftest import BenchRecorder
+from .fake_cloud import FakeCloud
+
+UPDATES_PER_DEVICE = 20
+
+
+async def bench_mq_burst(
+    hass: HomeAssistant,
+    fake_cloud: FakeCloud,
+    setup_integration: MockConfigEntry,
+    bench: BenchRecorder,
+) -> None:
+    """Push a burst of updates from the MQ thread and apply them on the loop."""
+    manager = setup_integration.runtime_data.manager
+    coordinator = setup_integration.runtime_data.coordinator
+    applied: list[int] = []
+    handle_updates = coordinator.async_handle_device_updates
+
+    def count_updates(device_ids: Collection[str]) -> None:
+        applied.append(len(device_ids))
+        handle_updates(device_ids)
+
+    coordinator.async_handle_device_updates = count_updates
+
+    def push_burst() -> None:
+        for index in range(UPDATES_PER_DEVICE):
+            for device_id in fake_cloud.device_ids:
+                manager.push_status(device_id, {"residual_electricity": index})
+
+    start = time.perf_counter()
+    await hass.async_add_executor_job(push_burst)
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=MQ_UPDATE_COALESCE_WINDOW + 1)
+    )
+    await hass.async_block_till_done()
+    bench.record(
+        "burst",
+        mean=time.perf_counter() - start,
+        messages=UPDATES_PER_DEVICE * len(fake_cloud.device_ids),
+        loop_updates=len(applied),
+        devices_applied=sum(applied),
+    )
@@ -0,0 +1,43 @@
+"""Benchmark resyncing the state of all locks after an MQ reconnect."""
+
+from __future__ import annotations
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.gimdow.const import DEVICE_DETAIL_BATCH_SIZE
+
+from .conftest import BenchRecorder
+from .fake_cloud import FakeCloud, FakeCloudConfig
+
+
+@pytest.fixture(params=[10, 60, 200])
+def cloud_config(request: pytest.FixtureRequest) -> FakeCloudConfig:
+    """Run the resync benchmarks for several account sizes."""
+    return FakeCloudConfig(devices=request.param, mq_connected=False)
+
+
+async def bench_resync_after_reconnect(
+    hass: HomeAssistant,
+    fake_cloud: FakeCloud,
+    setup_integration: MockConfigEntry,
+    bench: BenchRecorder,
+) -> None:
+    """Reconnect MQ and refresh, counting the requests sent to the cloud."""
+    coordinator = setup_integration.runtime_data.coordinator
+    coordinator.async_check_mq_connection()
+    fake_cloud.config.mq_connected = True
+    fake_cloud.requests.clear()
+
+    async def resync() -> None:
+        coordinator.async_check_mq_connection()
+        await coordinator.async_refresh()
+
+    await bench.measure("resync", resync)
+    # One status request per batch of locks, no log queries
+    batches = -(-len(fake_cloud.device_ids) // DEVICE_DETAIL_BATCH_SIZE)
+    assert fake_cloud.requests.get("device-detail") == batches
+    assert "logs" not in fake_cloud.requests
+    await hass.async_block_till_done()
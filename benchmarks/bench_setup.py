@@ -0,0 +1,51 @@
+"""Benchmark setting up a config entry."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.gimdow.const import STORAGE_SAVE_DELAY
+
+from .conftest import BenchRecorder
+from .fake_cloud import FakeCloud, FakeCloudConfig
+
+
+@pytest.fixture(params=[10, 60, 200])
+def cloud_config(request: pytest.FixtureRequest) -> FakeCloudConfig:
+    """Run the setup benchmarks for several account sizes."""
+    return FakeCloudConfig(devices=request.param)
+
+
+async def bench_setup_entry(
+    hass: HomeAssistant,
+    fake_cloud: FakeCloud,
+    config_entry: MockConfigEntry,
+    bench: BenchRecorder,
+) -> None:
+    """Set up an entry without a device snapshot, then again with one."""
+
+    async def setup() -> None:
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+
+    await bench.measure("cold", setup)
+    await hass.async_block_till_done()
+    # Flush the delayed device snapshot save before setting up again
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=STORAGE_SAVE_DELAY + 1)
+    )
+    await hass.async_block_till_done()
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    await bench.measure("snapshot", setup)
+    await hass.async_block_till_done()
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
@@ -0,0 +1,212 @@
+"""Fixtures of the offline Gimdow benchmarks.
+
+Run from the repository root with::
+
+    pip install -r benchmarks/requirements.txt
+    python -m pytest benchmarks --bench-save=bench.json
+    python -m pytest benchmarks --bench-compare=bench.json
+
+Comparing against a saved run fails every benchmark that got slower than
+the allowed tolerance.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Callable, Iterator
+import json
+from pathlib import Path
+import time
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.gimdow.const import (
+    CONF_ENDPOINT,
+    CONF_TERMINAL_ID,
+    CONF_TOKEN_INFO,
+    CONF_USER_CODE,
+    DOMAIN,
+)
+
+from .fake_cloud import FakeCloud, FakeCloudConfig, fake_manager_class
+
+RESULTS: dict[str, dict[str, float]] = {}
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the benchmark options."""
+    group = parser.getgroup("gimdow benchmarks")
+    group.addoption("--bench-save", help="Save the results to this JSON file")
+    group.addoption("--bench-compare", help="Compare the results to this JSON file")
+    group.addoption(
+        "--bench-tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown against the compared results (default 25%%)",
+    )
+
+
+def pytest_terminal_summary(
+    terminalreporter: Any, exitstatus: int, config: pytest.Config
+) -> None:
+    """Print and optionally save the benchmark results."""
+    if not RESULTS:
+        return
+    terminalreporter.section("gimdow benchmarks")
+    for name, values in sorted(RESULTS.items()):
+        formatted = ", ".join(f"{key}={value:.6f}" for key, value in values.items())
+        terminalreporter.write_line(f"{name}: {formatted}")
+    if path := config.getoption("--bench-save"):
+        Path(path).write_text(json.dumps(RESULTS, indent=2, sort_keys=True))
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Enable the custom integration in every benchmark."""
+
+
+class LoopLagMonitor:
+    """Measure how long the event loop is blocked between wakeups."""
+
+    interval = 0.001
+
+    def __init__(self) -> None:
+        """Initialize the monitor."""
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start measuring."""
+        self.max_lag = self.total_lag = 0.0
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop measuring."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        """Sleep in short intervals and record the oversleep."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - start - self.interval, 0)
+            self.max_lag = max(self.max_lag, lag)
+            self.total_lag += lag
+
+
+class BenchRecorder:
+    """Time benchmark steps and compare them to a saved run."""
+
+    def __init__(self, config: pytest.Config, name: str) -> None:
+        """Initialize the recorder."""
+        self._name = name
+        self._baseline: dict[str, dict[str, float]] = {}
+        self._tolerance = config.getoption("--bench-tolerance")
+        if path := config.getoption("--bench-compare"):
+            self._baseline = json.loads(Path(path).read_text())
+        self.loop_lag = LoopLagMonitor()
+
+    async def measure(
+        self, step: str, func: Callable[[], Any], rounds: int = 1
+    ) -> float:
+        """Await func for a number of rounds and record the mean duration."""
+        self.loop_lag.start()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await func()
+        duration = (time.perf_counter() - start) / rounds
+        await self.loop_lag.stop()
+        self.record(
+            step,
+            mean=duration,
+            loop_max_lag=self.loop_lag.max_lag,
+            loop_total_lag=self.loop_lag.total_lag / rounds,
+        )
+        return duration
+
+    def measure_sync(self, step: str, func: Callable[[], Any], rounds: int = 1) -> float:
+        """Call func for a number of rounds and record the mean duration."""
+        start = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        duration = (time.perf_counter() - start) / rounds
+        self.record(step, mean=duration)
+        return duration
+
+    def record(self, step: str, **values: float) -> None:
+        """Record values and check them against the saved run."""
+        key = f"{self._name}[{step}]"
+        RESULTS[key] = values
+        if (baseline := self._baseline.get(key)) is None:
+            return
+        allowed = baseline["mean"] * (1 + self._tolerance)
+        assert values["mean"] <= allowed, (
+            f"{key} regressed: {values['mean']:.6f}s > {allowed:.6f}s"
+        )
+
+
+@pytest.fixture
+def bench(request: pytest.FixtureRequest) -> BenchRecorder:
+    """Return a recorder for the running benchmark."""
+    return BenchRecorder(request.config, request.node.name)
+
+
+@pytest.fixture
+def cloud_config() -> FakeCloudConfig:
+    """Return the fake cloud behaviour, override to change it."""
+    return FakeCloudConfig()
+
+
+@pytest.fixture
+def fake_cloud(cloud_config: FakeCloudConfig) -> Iterator[FakeCloud]:
+    """Replace the SDK manager with one talking to a fake cloud."""
+    cloud = FakeCloud(cloud_config)
+    with patch("tuya_sharing.Manager", fake_manager_class(cloud)):
+        yield cloud
+
+
+@pytest.fixture
+def config_entry(hass: HomeAssistant) -> MockConfigEntry:
+    """Return a config entry for the fake account."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Bench",
+        data={
+            CONF_USER_CODE: "bench",
+            CONF_TERMINAL_ID: "bench",
+            CONF_ENDPOINT: "https://localhost",
+            CONF_TOKEN_INFO: {
+                "t": 0,
+                "uid": "bench",
+                "expire_time": 7200,
+                "access_token": "access",
+                "refresh_token": "refresh",
+            },
+        },
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture
+async def setup_integration(
+    hass: HomeAssistant, fake_cloud: FakeCloud, config_entry: MockConfigEntry
+) -> AsyncIterator[MockConfigEntry]:
+    """Set up the integration against the fake cloud."""
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    yield config_entry
+    await hass.config_entries.async_unload(config_entry.entry_id)
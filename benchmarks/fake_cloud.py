@@ -0,0 +1,275 @@
+"""Local stand-ins for the Tuya cloud, customer API and MQ."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import re
+import threading
+import time
+from typing import Any
+from uuid import uuid4
+
+import requests
+from tuya_sharing import CustomerDevice
+
+TICKET_PATH = re.compile(r"^/v1\.0/smart-lock/devices/(?P<id>[^/]+)/password-ticket$")
+OPERATE_PATH = re.compile(
+    r"^/v1\.0/smart-lock/devices/(?P<id>[^/]+)/password-free/door-operate$"
+)
+LOGS_PATH = re.compile(r"^/v1\.0/devices/(?P<id>[^/]+)/logs$")
+DETAIL_PATH = "/v1.0/m/life/ha/devices/detail"
+
+LOG_EVENT_TYPES = ("unlock_ble", "lock_record", "unlock_phone_remote", "manual_lock")
+
+
+@dataclass
+class FakeCloudConfig:
+    """Behaviour of the fake cloud."""
+
+    devices: int = 60
+    latency: float = 0.05  # seconds per request
+    rate_limit: float | None = None  # requests per second over all endpoints
+    log_volume: int = 50  # log entries per lock
+    mq_connected: bool = True
+
+
+class FakeCloud:
+    """Serve the subset of the cloud API used by the integration."""
+
+    def __init__(self, config: FakeCloudConfig) -> None:
+        """Initialize the fake cloud."""
+        self.config = config
+        self.requests: dict[str, int] = {}
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_requests = 0
+        now = int(time.time() * 1000)
+        self.logs: dict[str, list[dict[str, Any]]] = {
+            device_id: [
+                {
+                    "type": LOG_EVENT_TYPES[index % len(LOG_EVENT_TYPES)],
+                    "time": now - index * 60_000,
+                }
+                for index in range(config.log_volume)
+            ]
+            for device_id in self.device_ids
+        }
+
+    @property
+    def device_ids(self) -> list[str]:
+        """Return the IDs of the fake locks."""
+        return [f"bench{index:04d}" for index in range(self.config.devices)]
+
+    def build_devices(self) -> dict[str, CustomerDevice]:
+        """Return the device map of the account."""
+        return {
+            device_id: CustomerDevice(
+                id=device_id,
+                name=f"Lock {device_id}",
+                category="jtmspro",
+                product_id="bench",
+                product_name="Bench Lock",
+                online=True,
+                status={"lock_motor_state": True, "residual_electricity": 80},
+            )
+            for device_id in self.device_ids
+        }
+
+    def request(
+        self, method: str, path: str, data: dict[str, Any] | None
+    ) -> dict[str, Any]:
+        """Handle a request after the configured latency."""
+        time.sleep(self.config.latency)
+        if not self._allow():
+            return {"success": False, "code": 500, "msg": "request frequency limit"}
+
+        if method == "POST" and TICKET_PATH.match(path):
+            self._count("password-ticket")
+            return {
+                "success": True,
+                "result": {"ticket_id": uuid4().hex, "expire_time": 300},
+            }
+        if method == "POST" and OPERATE_PATH.match(path):
+            self._count("door-operate")
+            return {"success": True, "result": True}
+        if method == "GET" and (match := LOGS_PATH.match(path)):
+            self._count("logs")
+            params = data or {}
+            start_time = int(params.get("start_time", 0))
+            logs = [
+                log for log in self.logs.get(match["id"], []) if log["time"] >= start_time
+            ]
+            offset = int(params.get("start_row_key", 0))
+            size = int(params.get("size", 100))
+            has_next = offset + size < len(logs)
+            return {
+                "success": True,
+                "result": {
+                    "logs": logs[offset : offset + size],
+                    "has_next": has_next,
+                    "next_row_key": str(offset + size) if has_next else None,
+                },
+            }
+        if method == "GET" and path == DETAIL_PATH:
+            self._count("device-detail")
+            device_ids = (data or {}).get("devIds", "").split(",")
+            return {
+                "success": True,
+                "result": [
+                    {
+                        "id": device_id,
+                        "online": True,
+                        "status": [
+                            {"code": "lock_motor_state", "value": True},
+                            {"code": "residual_electricity", "value": 80},
+                        ],
+                    }
+                    for device_id in device_ids
+                    if device_id in self.logs
+                ],
+            }
+        self._count("unknown")
+        return {"success": False, "code": 1109, "msg": f"unknown path {path}"}
+
+    def _allow(self) -> bool:
+        """Apply the rate limit over one second windows."""
+        if self.config.rate_limit is None:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 1:
+                self._window_start = now
+                self._window_requests = 0
+            self._window_requests += 1
+            if self._window_requests > self.config.rate_limit:
+                self.rate_limited += 1
+                return False
+        return True
+
+    def _count(self, endpoint: str) -> None:
+        """Count a handled request."""
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+
+class FakeCustomerApi:
+    """Stand-in for tuya_sharing.CustomerApi."""
+
+    def __init__(self, cloud: FakeCloud) -> None:
+        """Initialize the fake API."""
+        self._cloud = cloud
+        # Replaced by the pooled session of the endpoint, never used
+        self.session = requests.Session()
+
+    def get(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Send a GET request."""
+        return self._reply(self._cloud.request("GET", path, params))
+
+    def post(
+        self,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Send a POST request."""
+        return self._reply(self._cloud.request("POST", path, params))
+
+    @staticmethod
+    def _reply(response: dict[str, Any]) -> dict[str, Any]:
+        """Raise error replies like the SDK does."""
+        if not response.get("success"):
+            raise Exception(f"network error:({response['code']}) {response['msg']}")
+        return response
+
+
+class FakeMqClient:
+    """Stand-in for the paho client of the SDK's MQ."""
+
+    def __init__(self, cloud: FakeCloud) -> None:
+        """Initialize the fake client."""
+        self._cloud = cloud
+
+    def is_connected(self) -> bool:
+        """Return if the client is connected."""
+        return self._cloud.config.mq_connected
+
+
+class FakeMq:
+    """Stand-in for tuya_sharing's SharingMQ."""
+
+    def __init__(self, cloud: FakeCloud) -> None:
+        """Initialize the fake MQ."""
+        self.client = FakeMqClient(cloud)
+        self.message_listeners: set[Any] = set()
+
+    def add_message_listener(self, listener: Any) -> None:
+        """Add a raw message listener."""
+        self.message_listeners.add(listener)
+
+    def remove_message_listener(self, listener: Any) -> None:
+        """Remove a raw message listener."""
+        self.message_listeners.discard(listener)
+
+    def stop(self) -> None:
+        """Stop the MQ."""
+
+
+class FakeManager:
+    """Stand-in for tuya_sharing.Manager."""
+
+    cloud: FakeCloud
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the fake manager."""
+        self.customer_api = FakeCustomerApi(self.cloud)
+        self.device_map: dict[str, CustomerDevice] = {}
+        self.user_homes: list[Any] = []
+        self.device_listeners: set[Any] = set()
+        self.mq: FakeMq | None = None
+
+    def update_device_cache(self) -> None:
+        """Load the devices of the account."""
+        time.sleep(self.cloud.config.latency)
+        self.device_map.clear()
+        self.device_map.update(self.cloud.build_devices())
+
+    def refresh_mq(self) -> None:
+        """Connect the MQ."""
+        time.sleep(self.cloud.config.latency)
+        self.mq = FakeMq(self.cloud)
+
+    def add_device_listener(self, listener: Any) -> None:
+        """Add a device listener."""
+        self.device_listeners.add(listener)
+
+    def remove_device_listener(self, listener: Any) -> None:
+        """Remove a device listener."""
+        self.device_listeners.discard(listener)
+
+    def unload(self) -> None:
+        """Revoke the credentials."""
+
+    def push_status(self, device_id: str, status: dict[str, Any]) -> None:
+        """Deliver a status report as the MQ thread would."""
+        if self.mq is not None:
+            message = {
+                "protocol": 4,
+                "data": {
+                    "devId": device_id,
+                    "status": [
+                        {"code": code, "value": value} for code, value in status.items()
+                    ],
+                },
+            }
+            for message_listener in self.mq.message_listeners:
+                message_listener(message)
+        device = self.device_map[device_id]
+        device.status.update(status)
+        for listener in self.device_listeners:
+            listener.update_device(device)
+
+
+def fake_manager_class(cloud: FakeCloud) -> type[FakeManager]:
+    """Return a manager class bound to a fake cloud."""
+    return type("BoundFakeManager", (FakeManager,), {"cloud": cloud})
@@ -2,38 +2,57 @@
 
 from __future__ import annotations
 
+import asyncio
+import copy
+from functools import partial
 import logging
-from typing import Any, NamedTuple
-
-from tuya_sharing import (
-    CustomerDevice,
-    Manager,
-    SharingDeviceListener,
-    SharingTokenListener,
-)
+import threading
+import time
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers import device_registry as dr
-from homeassistant.helpers.dispatcher import dispatcher_send
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_send, dispatcher_send
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.typing import ConfigType
 
 from .const import (
     CONF_ENDPOINT,
     CONF_TERMINAL_ID,
     CONF_TOKEN_INFO,
     CONF_USER_CODE,
+    DEVICE_CACHE_RETRY_INTERVAL,
     DOMAIN,
     LOGGER,
     PLATFORMS,
     GIMDOW_CLIENT_ID,
     GIMDOW_DISCOVERY_NEW,
-    GIMDOW_HA_SIGNAL_UPDATE_ENTITY,
+    GIMDOW_DISCOVERY_REMOVED,
+    LOCK_CATEGORIES,
+    METRICS_ENDPOINT_REFRESH_MQ,
+    METRICS_ENDPOINT_UPDATE_DEVICE_CACHE,
+    MQ_PROTOCOL_DEVICE_REPORT,
+    MQ_UPDATE_COALESCE_WINDOW,
 )
+from .api import GimdowApiGateway, async_acquire_session, async_release_session
+from .auth import GimdowTokenManager, async_import_sdk
+from .coordinator import GimdowCoordinator
+from .history import EVENT_SOURCE_MQ, EVENT_TYPES, GimdowEventHistory, LockEvent
+from .metrics import GimdowMetrics
+from .services import async_setup_services
+from .storage import GimdowDeviceSnapshotStore, GimdowLogCursorStore
+from .tickets import PasswordTicketCache
+
+if TYPE_CHECKING:
+    from tuya_sharing import CustomerDevice, Manager
 
 # Suppress logs from the library, it logs unneeded on error
 logging.getLogger("tuya_sharing").setLevel(logging.CRITICAL)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 # TuyaConfigEntry is a type alias for a configuration entry
 type TuyaConfigEntry = ConfigEntry[HomeAssistantTuyaData]
 
@@ -42,42 +61,211 @@ class HomeAssistantTuyaData(NamedTuple):
     """Tuya data stored in the Home Assistant data object."""
 
     manager: Manager
-    listener: SharingDeviceListener
+    listener: DeviceListener
+    coordinator: GimdowCoordinator
+    tickets: PasswordTicketCache
+    metrics: GimdowMetrics
+    history: GimdowEventHistory
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Gimdow Lock services."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: TuyaConfigEntry) -> bool:
     """Async setup hass config entry."""
-    token_listener = TokenListener(hass, entry)
-    manager = Manager(
+    sharing = await async_import_sdk(hass)
+    token_manager = GimdowTokenManager(hass, entry)
+    token_manager.async_setup()
+    manager = sharing.Manager(
         GIMDOW_CLIENT_ID,
         entry.data[CONF_USER_CODE],
         entry.data[CONF_TERMINAL_ID],
         entry.data[CONF_ENDPOINT],
-        entry.data[CONF_TOKEN_INFO],
-        token_listener,
+        token_manager.token_info,
+        token_manager,
+    )
+    # Reuse the keep-alive connections of other entries of the same endpoint
+    endpoint = entry.data[CONF_ENDPOINT]
+    manager.customer_api.session.close()
+    manager.customer_api.session = async_acquire_session(hass, endpoint)
+    entry.async_on_unload(partial(async_release_session, hass, endpoint))
+
+    log_cursors = GimdowLogCursorStore(hass, entry.entry_id)
+    await log_cursors.async_load()
+    snapshot = GimdowDeviceSnapshotStore(hass, entry.entry_id)
+    snapshot_devices = await snapshot.async_load()
+    history = GimdowEventHistory(hass, entry.entry_id)
+    await history.async_load()
+
+    # Send all cloud requests of the account through shared rate limits
+    metrics = GimdowMetrics()
+    gateway = GimdowApiGateway(
+        hass, manager, entry.data[CONF_TOKEN_INFO]["uid"], metrics
+    )
+    entry.async_on_unload(gateway.async_shutdown)
+
+    # Poll all locks of the account in one scheduled batch
+    coordinator = GimdowCoordinator(
+        hass,
+        manager,
+        gateway,
+        log_cursors,
+        snapshot,
+        history,
+        metrics,
+        entry.options,
     )
 
-    listener = DeviceListener(hass, manager)
+    listener = DeviceListener(hass, manager, coordinator, metrics)
     manager.add_device_listener(listener)
+    entry.async_on_unload(listener.async_shutdown)
+
+    if snapshot_devices:
+        # Start from the devices known at the last run, the cloud is asked later
+        for item in snapshot_devices:
+            is_locked = item.pop("is_locked", None)
+            manager.device_map[item["id"]] = sharing.CustomerDevice(**item)
+            if is_locked is not None:
+                coordinator.get_state(item["id"]).is_locked = is_locked
+    else:
+        # Get all devices from Tuya
+        await async_update_device_cache(hass, manager, metrics)
+        await coordinator.async_config_entry_first_refresh()
+
+    tickets = PasswordTicketCache(hass, manager, gateway)
+    entry.async_on_unload(tickets.async_shutdown)
+
+    # Connection is successful, store the manager, listener & coordinator
+    entry.runtime_data = HomeAssistantTuyaData(
+        manager=manager,
+        listener=listener,
+        coordinator=coordinator,
+        tickets=tickets,
+        metrics=metrics,
+        history=history,
+    )
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+    # Sync the device registry with the devices of the account
+    async_reconcile_device_registry(hass, entry, manager)
 
-    # Get all devices from Tuya
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    if snapshot_devices:
+        entry.async_create_background_task(
+            hass, async_reconcile_devices(hass, entry), f"{DOMAIN} device refresh"
+        )
+        return True
+
+    # Subscribe to receive updates
+    await async_refresh_mq(hass, manager, listener, metrics)
+    return True
+
+
+async def async_update_device_cache(
+    hass: HomeAssistant, manager: Manager, metrics: GimdowMetrics
+) -> None:
+    """Get all devices of the account from Tuya.
+
+    The SDK clears and refills the device map of the manager it refreshes, so
+    the devices are loaded into a copy of the manager in the executor. The new
+    device map is swapped in on the event loop, which keeps iterating the old
+    map meanwhile.
+    """
+    loader = copy.copy(manager)
+    loader.device_map = {}
     try:
-        await hass.async_add_executor_job(manager.update_device_cache)
+        with metrics.measure(METRICS_ENDPOINT_UPDATE_DEVICE_CACHE):
+            await hass.async_add_executor_job(loader.update_device_cache)
     except Exception as exc:
         if "sign invalid" in str(exc):
             msg = "Authentication failed. Please re-authenticate"
             raise ConfigEntryAuthFailed(msg) from exc
         raise
+    manager.user_homes = loader.user_homes
+    manager.device_map = loader.device_map
+
+
+async def async_refresh_mq(
+    hass: HomeAssistant,
+    manager: Manager,
+    listener: DeviceListener,
+    metrics: GimdowMetrics,
+) -> None:
+    """Subscribe to the real-time device updates of the account."""
+    with metrics.measure(METRICS_ENDPOINT_REFRESH_MQ):
+        await hass.async_add_executor_job(manager.refresh_mq)
+    # Every refresh starts a new MQ, which needs the raw message listener again
+    manager.mq.add_message_listener(listener.on_message)
+
+
+async def async_reconcile_devices(hass: HomeAssistant, entry: TuyaConfigEntry) -> None:
+    """Reconcile the devices of a snapshot start with the cloud."""
+    gimdow = entry.runtime_data
+    known_device_ids = set(gimdow.manager.device_map)
+
+    # Resync the status of the known locks in batches before the slow device refresh
+    await gimdow.coordinator.async_refresh()
+
+    while True:
+        try:
+            await async_update_device_cache(hass, gimdow.manager, gimdow.metrics)
+            break
+        except ConfigEntryAuthFailed:
+            entry.async_start_reauth(hass)
+            return
+        except Exception as exc:
+            LOGGER.warning("Failed to get Gimdow devices, retrying: %s", exc)
+            await asyncio.sleep(DEVICE_CACHE_RETRY_INTERVAL)
+
+    for device_id in known_device_ids - set(gimdow.manager.device_map):
+        gimdow.listener.async_remove_device(device_id)
+    async_reconcile_device_registry(hass, entry, gimdow.manager)
+    if new_device_ids := set(gimdow.manager.device_map) - known_device_ids:
+        async_dispatcher_send(hass, GIMDOW_DISCOVERY_NEW, list(new_device_ids))
+    gimdow.coordinator.async_reload_status()
+
+    # Subscribe to receive updates, the logs are polled until MQ is up
+    while True:
+        try:
+            await async_refresh_mq(
+                hass, gimdow.manager, gimdow.listener, gimdow.metrics
+            )
+            break
+        except Exception as exc:
+            LOGGER.warning("Failed to subscribe to Gimdow updates, retrying: %s", exc)
+            await asyncio.sleep(DEVICE_CACHE_RETRY_INTERVAL)
+    await gimdow.coordinator.async_refresh()
+
+
+async def async_update_options(hass: HomeAssistant, entry: TuyaConfigEntry) -> None:
+    """Apply updated options to the coordinator."""
+    entry.runtime_data.coordinator.async_apply_options(entry.options)
+
+
+@callback
+def async_reconcile_device_registry(
+    hass: HomeAssistant, entry: TuyaConfigEntry, device_manager: Manager
+) -> None:
+    """Add and remove the registry devices of a config entry that changed."""
+    device_registry = dr.async_get(hass)
+    registered: dict[str, dr.DeviceEntry] = {}
+    for device_entry in dr.async_entries_for_config_entry(
+        device_registry, entry.entry_id
+    ):
+        for domain, device_id in device_entry.identifiers:
+            if domain == DOMAIN:
+                registered[device_id] = device_entry
+                break
 
-    # Connection is successful, store the manager & listener
-    entry.runtime_data = HomeAssistantTuyaData(manager=manager, listener=listener)
-
-    # Cleanup device registry
-    await cleanup_device_registry(hass, manager)
+    for device_id in registered.keys() - device_manager.device_map.keys():
+        device_registry.async_remove_device(registered[device_id].id)
 
-    # Register known device IDs
-    device_registry = dr.async_get(hass)
-    for device in manager.device_map.values():
+    for device_id in device_manager.device_map.keys() - registered.keys():
+        device = device_manager.device_map[device_id]
         device_registry.async_get_or_create(
             config_entry_id=entry.entry_id,
             identifiers={(DOMAIN, device.id)},
@@ -87,20 +275,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: TuyaConfigEntry) -> bool
             model_id=device.product_id,
         )
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    # Subscribe to receive updates
-    await hass.async_add_executor_job(manager.refresh_mq)
-    return True
-
-
-async def cleanup_device_registry(hass: HomeAssistant, device_manager: Manager) -> None:
-    """Remove deleted device registry entry if there are no remaining entities."""
-    device_registry = dr.async_get(hass)
-    for dev_id, device_entry in list(device_registry.devices.items()):
-        for item in device_entry.identifiers:
-            if item[0] == DOMAIN and item[1] not in device_manager.device_map:
-                device_registry.async_remove_device(dev_id)
-                break
+    for device_id in registered.keys() & device_manager.device_map.keys():
+        device = device_manager.device_map[device_id]
+        if registered[device_id].name != device.name:
+            device_registry.async_update_device(
+                registered[device_id].id, name=device.name
+            )
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: TuyaConfigEntry) -> bool:
@@ -108,6 +288,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: TuyaConfigEntry) -> boo
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         gimdow = entry.runtime_data
         if gimdow.manager.mq is not None:
+            gimdow.manager.mq.remove_message_listener(gimdow.listener.on_message)
             gimdow.manager.mq.stop()
         gimdow.manager.remove_device_listener(gimdow.listener)
     return unload_ok
@@ -118,7 +299,8 @@ async def async_remove_entry(hass: HomeAssistant, entry: TuyaConfigEntry) -> Non
 
     This will revoke the credentials from Tuya.
     """
-    manager = Manager(
+    sharing = await async_import_sdk(hass)
+    manager = sharing.Manager(
         GIMDOW_CLIENT_ID,
         entry.data[CONF_USER_CODE],
         entry.data[CONF_TERMINAL_ID],
@@ -126,24 +308,114 @@ async def async_remove_entry(hass: HomeAssistant, entry: TuyaConfigEntry) -> Non
         entry.data[CONF_TOKEN_INFO],
     )
     await hass.async_add_executor_job(manager.unload)
+    await GimdowLogCursorStore(hass, entry.entry_id).async_remove()
+    await GimdowDeviceSnapshotStore(hass, entry.entry_id).async_remove()
+    await GimdowEventHistory(hass, entry.entry_id).async_remove()
 
 
-class DeviceListener(SharingDeviceListener):
-    """Device Update Listener."""
+class DeviceListener:
+    """Device Update Listener.
 
-    def __init__(self, hass: HomeAssistant, manager: Manager) -> None:
+    Implements the SDK's device listener interface without subclassing it.
+
+    Status updates arrive on the MQ thread. Updates of devices without entities
+    are dropped, the rest are collected and applied on the event loop together
+    once per MQ_UPDATE_COALESCE_WINDOW.
+
+    Device updates only carry the device with its status already updated, so
+    the access events are read from the raw MQ messages, which list every
+    reported DP even when its value did not change.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        manager: Manager,
+        coordinator: GimdowCoordinator,
+        metrics: GimdowMetrics,
+    ) -> None:
         """Initialize the DeviceListener."""
         self.hass = hass
         self.manager = manager
+        self.coordinator = coordinator
+        self.metrics = metrics
+        self._pending: set[str] = set()
+        self._pending_events: dict[str, list[LockEvent]] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_scheduled = False
+        self._unsub_flush: CALLBACK_TYPE | None = None
 
     def update_device(self, device: CustomerDevice) -> None:
         """Update device status."""
-        LOGGER.debug(
-            "Received update for device %s: %s",
-            device.id,
-            self.manager.device_map[device.id].status,
+        self.metrics.record_mq_message()
+        if (
+            device.category not in LOCK_CATEGORIES
+            or device.id not in self.manager.device_map
+        ):
+            return
+        LOGGER.debug("Received update for device %s: %s", device.id, device.status)
+        with self._pending_lock:
+            self._pending.add(device.id)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self.hass.loop.call_soon_threadsafe(self._async_schedule_flush)
+
+    def on_message(self, msg: dict[str, Any]) -> None:
+        """Collect the access events of a status report of a lock."""
+        if msg.get("protocol") != MQ_PROTOCOL_DEVICE_REPORT:
+            return
+        data = msg.get("data") or {}
+        device = self.manager.device_map.get(data.get("devId"))
+        if device is None or device.category not in LOCK_CATEGORIES:
+            return
+        now = int(time.time() * 1000)
+        events: list[LockEvent] = []
+        for item in data.get("status") or ():
+            code = item.get("code")
+            if code is None and (dp := device.local_strategy.get(item.get("dpId"))):
+                # Locks on the local protocol report DP IDs instead of codes
+                code = dp.get("status_code")
+            if code in EVENT_TYPES and "value" in item:
+                events.append(LockEvent(now, code, item["value"], EVENT_SOURCE_MQ))
+        if not events:
+            return
+        with self._pending_lock:
+            self._pending_events.setdefault(device.id, []).extend(events)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self.hass.loop.call_soon_threadsafe(self._async_schedule_flush)
+
+    @callback
+    def _async_schedule_flush(self) -> None:
+        """Apply the collected updates once the window has passed."""
+        self._unsub_flush = async_call_later(
+            self.hass, MQ_UPDATE_COALESCE_WINDOW, self._async_flush
         )
-        dispatcher_send(self.hass, f"{GIMDOW_HA_SIGNAL_UPDATE_ENTITY}_{device.id}")
+
+    @callback
+    def _async_flush(self, _now: Any = None) -> None:
+        """Apply the collected updates."""
+        self._unsub_flush = None
+        with self._pending_lock:
+            device_ids, self._pending = self._pending, set()
+            events, self._pending_events = self._pending_events, {}
+            self._flush_scheduled = False
+        for device_id, device_events in events.items():
+            if device_id in self.manager.device_map:
+                self.coordinator.history.async_add(device_id, device_events)
+        self.coordinator.async_handle_device_updates(device_ids)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Drop the collected updates."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        with self._pending_lock:
+            self._pending.clear()
+            self._pending_events.clear()
 
     def add_device(self, device: CustomerDevice) -> None:
         """Handle device addition."""
@@ -157,36 +429,9 @@ class DeviceListener(SharingDeviceListener):
     def async_remove_device(self, device_id: str) -> None:
         """Remove the device from Home Assistant."""
         LOGGER.debug("Remove device: %s", device_id)
+        async_dispatcher_send(self.hass, GIMDOW_DISCOVERY_REMOVED, device_id)
+        self.coordinator.async_remove_device(device_id)
         device_registry = dr.async_get(self.hass)
         device_entry = device_registry.async_get_device(identifiers={(DOMAIN, device_id)})
         if device_entry is not None:
             device_registry.async_remove_device(device_entry.id)
-
-
-class TokenListener(SharingTokenListener):
-    """Token listener for token updates."""
-
-    def __init__(self, hass: HomeAssistant, entry: TuyaConfigEntry) -> None:
-        """Initialize the TokenListener."""
-        self.hass = hass
-        self.entry = entry
-
-    def update_token(self, token_info: dict[str, Any]) -> None:
-        """Update token info in config entry."""
-        data = {
-            **self.entry.data,
-            CONF_TOKEN_INFO: {
-                "t": token_info["t"],
-                "uid": token_info["uid"],
-                "expire_time": token_info["expire_time"],
-                "access_token": token_info["access_token"],
-                "refresh_token": token_info["refresh_token"],
-            },
-        }
-
-        @callback
-        def async_update_entry() -> None:
-            """Update config entry."""
-            self.hass.config_entries.async_update_entry(self.entry, data=data)
-
-        self.hass.add_job(async_update_entry)
@@ -0,0 +1,435 @@
+"""Request gateway for the Gimdow cloud API."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import random
+import re
+import time
+from typing import TYPE_CHECKING, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util.hass_dict import HassKey
+
+from .const import (
+    API_BACKOFF_BASE,
+    API_BACKOFF_MAX,
+    API_ENDPOINT_PROBE,
+    API_MAX_ATTEMPTS,
+    API_PROBE_PATH,
+    API_RATE_LIMITS,
+    API_REQUEST_TIMEOUT,
+    CIRCUIT_BREAKER_RESET_TIMEOUT,
+    CIRCUIT_BREAKER_THRESHOLD,
+    DEFAULT_API_RATE_LIMIT,
+    DOMAIN,
+    GIMDOW_AUTH_ERROR_CODES,
+    GIMDOW_DEVICE_OFFLINE_CODES,
+    GIMDOW_TRANSIENT_ERROR_CODES,
+    LOGGER,
+    SESSION_POOL_MAXSIZE,
+)
+from .metrics import GimdowMetrics
+
+if TYPE_CHECKING:
+    from tuya_sharing import Manager
+
+    from .tracing import CommandTrace
+
+DATA_RATE_LIMITERS: HassKey[dict[tuple[str, str], TokenBucket]] = HassKey(
+    f"{DOMAIN}_rate_limiters"
+)
+DATA_SESSIONS: HassKey[dict[str, SharedSession]] = HassKey(f"{DOMAIN}_sessions")
+DATA_CIRCUIT_BREAKERS: HassKey[dict[str, CircuitBreaker]] = HassKey(
+    f"{DOMAIN}_circuit_breakers"
+)
+
+# The SDK raises Exception(f"network error:({code}) {msg}") for every error reply
+SDK_ERROR_REPLY = re.compile(r"^network error:\((?P<code>[^)]*)\) ?(?P<msg>.*)$", re.S)
+
+
+class GimdowApiError(HomeAssistantError):
+    """Error to indicate a failed request to the Gimdow cloud."""
+
+
+class GimdowAuthError(GimdowApiError):
+    """Error to indicate the credentials were rejected by the Gimdow cloud."""
+
+
+class GimdowUnavailableError(GimdowApiError):
+    """Error to indicate requests are not sent while a circuit breaker is open."""
+
+
+def sdk_error_reply(exc: Exception) -> dict[str, Any] | None:
+    """Return the error reply the SDK raised as an exception, if it was one."""
+    if (match := SDK_ERROR_REPLY.match(str(exc))) is None:
+        return None
+    code: int | str = match["code"]
+    try:
+        code = int(code)
+    except ValueError:
+        pass
+    return {"success": False, "code": code, "msg": match["msg"]}
+
+
+def _send_request(
+    sent_at: list[float], method: Any, path: str, data: dict[str, Any] | None
+) -> dict[str, Any] | None:
+    """Send a request from an executor thread, noting when it started."""
+    sent_at.append(time.monotonic())
+    return method(path, data)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTP adapter applying a timeout to requests sent without one."""
+
+    def send(self, request: Any, **kwargs: Any) -> Any:
+        """Send a request, the SDK does not set a timeout itself."""
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = API_REQUEST_TIMEOUT
+        return super().send(request, **kwargs)
+
+
+@dataclass(slots=True)
+class SharedSession:
+    """HTTP session shared by the config entries of one endpoint."""
+
+    session: requests.Session
+    users: int = 0
+
+
+@callback
+def async_acquire_session(hass: HomeAssistant, endpoint: str) -> requests.Session:
+    """Return the pooled HTTP session of an endpoint, creating it if needed.
+
+    Requests are signed per call, so the keep-alive connections of a session
+    can be shared between accounts. The MQ connection is authenticated per
+    account and is not shared.
+    """
+    sessions = hass.data.setdefault(DATA_SESSIONS, {})
+    if (shared := sessions.get(endpoint)) is None:
+        session = requests.Session()
+        adapter = TimeoutHTTPAdapter(pool_maxsize=SESSION_POOL_MAXSIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        shared = sessions[endpoint] = SharedSession(session)
+    shared.users += 1
+    return shared.session
+
+
+@callback
+def async_release_session(hass: HomeAssistant, endpoint: str) -> None:
+    """Release the pooled HTTP session of an endpoint, closing it when unused."""
+    sessions = hass.data.get(DATA_SESSIONS, {})
+    if (shared := sessions.get(endpoint)) is None:
+        return
+    shared.users -= 1
+    if shared.users <= 0:
+        del sessions[endpoint]
+        shared.session.close()
+
+
+class CircuitBreaker:
+    """Stop sending requests after repeated failures.
+
+    Once open, requests fail right away until the reset timeout passed. The
+    next request is then let through as a probe, closing the breaker when it
+    succeeds and opening it again when it fails.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float) -> None:
+        """Initialize the circuit breaker."""
+        self._threshold = threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self.opened_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        """Return if requests have to fail right away."""
+        return (
+            self.opened_at is not None
+            and time.monotonic() - self.opened_at < self._reset_timeout
+        )
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful request."""
+        self._failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> bool:
+        """Count a failed request and return if the breaker opened."""
+        self._failures += 1
+        if self._failures < self._threshold:
+            return False
+        opened = self.opened_at is None
+        self.opened_at = time.monotonic()
+        return opened
+
+
+class TokenBucket:
+    """Token bucket limiting the request rate of one endpoint."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """Initialize the token bucket."""
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    async def async_acquire(self) -> None:
+        """Wait until a request may be sent."""
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self._capacity, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+class GimdowApiGateway:
+    """Send the cloud requests of one account through shared rate limits.
+
+    Transient errors are retried with a jittered exponential backoff, while
+    rejected credentials fail right away with a GimdowAuthError.
+
+    Requests of an account that keeps failing, or of a lock the cloud reports
+    offline, fail right away with a GimdowUnavailableError while their circuit
+    breaker is open. Only requests that got no answer or kept getting transient
+    error replies count toward the account breaker; an offline lock only opens
+    its own. A background probe closes the account breaker again.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        manager: Manager,
+        account_id: str,
+        metrics: GimdowMetrics,
+    ) -> None:
+        """Initialize the gateway."""
+        self._hass = hass
+        self._manager = manager
+        self._account_id = account_id
+        self._metrics = metrics
+        self._device_breakers: dict[str, CircuitBreaker] = {}
+        self._unsub_probe: CALLBACK_TYPE | None = None
+
+    @property
+    def _breaker(self) -> CircuitBreaker:
+        """Return the circuit breaker shared by all entries of the account."""
+        breakers = self._hass.data.setdefault(DATA_CIRCUIT_BREAKERS, {})
+        if (breaker := breakers.get(self._account_id)) is None:
+            breaker = breakers[self._account_id] = CircuitBreaker(
+                CIRCUIT_BREAKER_THRESHOLD, CIRCUIT_BREAKER_RESET_TIMEOUT
+            )
+        return breaker
+
+    def _device_breaker(self, device_id: str) -> CircuitBreaker:
+        """Return the circuit breaker of a device."""
+        if (breaker := self._device_breakers.get(device_id)) is None:
+            # A single offline response is enough to stop talking to a lock
+            breaker = self._device_breakers[device_id] = CircuitBreaker(
+                1, CIRCUIT_BREAKER_RESET_TIMEOUT
+            )
+        return breaker
+
+    def is_available(self, device_id: str | None = None) -> bool:
+        """Return if requests, optionally for a device, are sent."""
+        if self._breaker.is_open:
+            return False
+        return device_id is None or not self._device_breaker(device_id).is_open
+
+    def check_available(self, device_id: str | None = None) -> None:
+        """Raise if requests, optionally for a device, are not sent."""
+        if self._breaker.is_open:
+            raise GimdowUnavailableError("The Gimdow cloud is unavailable")
+        if device_id is not None and self._device_breaker(device_id).is_open:
+            raise GimdowUnavailableError(f"Gimdow lock {device_id} is offline")
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel the scheduled recovery probe."""
+        if self._unsub_probe is not None:
+            self._unsub_probe()
+            self._unsub_probe = None
+
+    async def async_get(
+        self,
+        endpoint: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        device_id: str | None = None,
+        trace: CommandTrace | None = None,
+    ) -> dict[str, Any]:
+        """Send a GET request."""
+        return await self._async_request(
+            endpoint, self._manager.customer_api.get, path, params, device_id, trace
+        )
+
+    async def async_post(
+        self,
+        endpoint: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        device_id: str | None = None,
+        trace: CommandTrace | None = None,
+        idempotent: bool = True,
+    ) -> dict[str, Any]:
+        """Send a POST request with its parameters in the query.
+
+        Requests that must not run twice, like lock commands, are sent once.
+        """
+        return await self._async_request(
+            endpoint,
+            self._manager.customer_api.post,
+            path,
+            params,
+            device_id,
+            trace,
+            API_MAX_ATTEMPTS if idempotent else 1,
+        )
+
+    async def _async_request(
+        self,
+        endpoint: str,
+        method: Any,
+        path: str,
+        data: dict[str, Any] | None,
+        device_id: str | None,
+        trace: CommandTrace | None = None,
+        max_attempts: int = API_MAX_ATTEMPTS,
+    ) -> dict[str, Any]:
+        """Send a request, retrying transient failures.
+
+        Error replies of the cloud are classified by their code: rejected
+        credentials raise a GimdowAuthError, transient errors are retried and
+        any other error reply is returned to the caller right away.
+
+        A given command trace gets a span for every backoff, rate limit wait,
+        executor wait and HTTP attempt of the request.
+        """
+
+        def add_span(stage: str, start: float, end: float) -> None:
+            """Record a stage of the request in the command trace."""
+            if trace is not None:
+                trace.add_span(f"{endpoint}.{stage}", start, end)
+
+        if endpoint != API_ENDPOINT_PROBE:
+            self.check_available(device_id)
+        bucket = self._get_bucket(endpoint)
+        error: Exception | None = None
+
+        for attempt in range(max_attempts):
+            if attempt:
+                delay = min(API_BACKOFF_MAX, API_BACKOFF_BASE * 2 ** (attempt - 1))
+                backoff_start = time.monotonic()
+                await asyncio.sleep(delay * random.uniform(0.5, 1))
+                add_span("backoff", backoff_start, time.monotonic())
+            wait_start = time.monotonic()
+            await bucket.async_acquire()
+
+            start = time.monotonic()
+            add_span("rate_limit", wait_start, start)
+            # Set once an executor thread picks the request up
+            sent_at: list[float] = []
+            try:
+                try:
+                    response = await self._hass.async_add_executor_job(
+                        _send_request, sent_at, method, path, data
+                    )
+                finally:
+                    if sent_at:
+                        add_span("executor", start, sent_at[0])
+                        add_span(f"http_{attempt + 1}", sent_at[0], time.monotonic())
+            except Exception as exc:
+                if (response := sdk_error_reply(exc)) is None:
+                    # The request did not get an answer from the cloud
+                    self._metrics.record(
+                        endpoint, time.monotonic() - start, True, device_id
+                    )
+                    if "sign invalid" in str(exc):
+                        raise GimdowAuthError("Authentication failed") from exc
+                    error = exc
+                    LOGGER.debug("Request to %s failed: %s", endpoint, exc)
+                    continue
+
+            success = response is not None and bool(response.get("success"))
+            self._metrics.record(
+                endpoint, time.monotonic() - start, not success, device_id
+            )
+
+            if response is None:
+                # The SDK returns nothing when the HTTP request failed
+                error = GimdowApiError(f"No response from {endpoint}")
+                continue
+            if success:
+                self._record_success(device_id)
+                return response
+
+            code = response.get("code")
+            if code in GIMDOW_AUTH_ERROR_CODES:
+                raise GimdowAuthError(
+                    f"Authentication failed: {response.get('msg', code)}"
+                )
+            if code not in GIMDOW_TRANSIENT_ERROR_CODES:
+                # The cloud answered, only the device may be unreachable
+                self._breaker.record_success()
+                if device_id is not None and code in GIMDOW_DEVICE_OFFLINE_CODES:
+                    if self._device_breaker(device_id).record_failure():
+                        LOGGER.info("Gimdow lock %s is offline", device_id)
+                return response
+            error = GimdowApiError(f"{endpoint} failed: {response.get('msg', code)}")
+
+        if self._breaker.record_failure():
+            LOGGER.warning("The Gimdow cloud is unavailable, pausing requests")
+        if self._breaker.opened_at is not None:
+            self._async_schedule_probe()
+        raise GimdowApiError(f"Request to {endpoint} failed: {error}") from error
+
+    def _record_success(self, device_id: str | None) -> None:
+        """Close the breakers of a successful request."""
+        if self._breaker.opened_at is not None:
+            LOGGER.info("The Gimdow cloud is available again")
+        self._breaker.record_success()
+        if device_id is not None:
+            self._device_breaker(device_id).record_success()
+
+    @callback
+    def _async_schedule_probe(self) -> None:
+        """Probe the cloud once the account breaker lets requests through."""
+        if self._unsub_probe is None:
+            self._unsub_probe = async_call_later(
+                self._hass,
+                CIRCUIT_BREAKER_RESET_TIMEOUT,
+                HassJob(self._async_probe, cancel_on_shutdown=True),
+            )
+
+    async def _async_probe(self, _now: Any) -> None:
+        """Send a cheap request to find out if the cloud recovered."""
+        self._unsub_probe = None
+        if self._breaker.opened_at is None:
+            return
+        try:
+            await self.async_get(API_ENDPOINT_PROBE, API_PROBE_PATH)
+        except GimdowApiError as error:
+            LOGGER.debug("The Gimdow cloud is still unavailable: %s", error)
+
+    def _get_bucket(self, endpoint: str) -> TokenBucket:
+        """Return the rate limiter shared by all entries of the account."""
+        limiters = self._hass.data.setdefault(DATA_RATE_LIMITERS, {})
+        key = (self._account_id, endpoint)
+        if (bucket := limiters.get(key)) is None:
+            rate, capacity = API_RATE_LIMITS.get(endpoint, DEFAULT_API_RATE_LIMIT)
+            bucket = limiters[key] = TokenBucket(rate, capacity)
+        return bucket
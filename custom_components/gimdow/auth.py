@@ -0,0 +1,122 @@
+"""Token handling for the Gimdow Lock integration."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+import importlib
+import threading
+from types import ModuleType
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import CONF_TOKEN_INFO, TOKEN_SAVE_DELAY
+
+if TYPE_CHECKING:
+    from . import TuyaConfigEntry
+
+TOKEN_INFO_KEYS = ("t", "uid", "expire_time", "access_token", "refresh_token")
+
+# Keys of the token info that do not need to be written to disk
+TOKEN_VOLATILE_KEYS = {"t"}
+
+
+async def async_import_sdk(hass: HomeAssistant) -> ModuleType:
+    """Import the Tuya sharing SDK once it is needed, off the event loop."""
+    return await hass.async_add_import_executor_job(
+        importlib.import_module, "tuya_sharing"
+    )
+
+
+def build_token_info(info: Mapping[str, Any]) -> dict[str, Any]:
+    """Return the token info to store from a login or refresh response."""
+    return {key: info[key] for key in TOKEN_INFO_KEYS}
+
+
+class GimdowTokenManager:
+    """Keep the refreshed token in memory and persist it debounced.
+
+    Implements the SDK's token listener interface without subclassing it, so
+    the SDK is not imported with the integration.
+
+    The SDK refreshes the token from an executor thread. The new token is kept
+    right away and written to the config entry after TOKEN_SAVE_DELAY, on
+    unload or when Home Assistant stops, skipping writes that would not change
+    anything but the request time.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: TuyaConfigEntry) -> None:
+        """Initialize the token manager."""
+        self.hass = hass
+        self.entry = entry
+        self._token_info: dict[str, Any] = dict(entry.data[CONF_TOKEN_INFO])
+        # Token last read from or written to the config entry
+        self._persisted = entry.data[CONF_TOKEN_INFO]
+        self._lock = threading.Lock()
+        self._unsub_save: CALLBACK_TYPE | None = None
+
+    @property
+    def token_info(self) -> dict[str, Any]:
+        """Return the current token info."""
+        with self._lock:
+            return self._token_info
+
+    def update_token(self, token_info: dict[str, Any]) -> None:
+        """Keep a refreshed token and schedule persisting it."""
+        with self._lock:
+            self._token_info = build_token_info(token_info)
+        self.hass.add_job(self._async_schedule_save)
+
+    @callback
+    def async_setup(self) -> None:
+        """Persist a pending token on unload and when Home Assistant stops."""
+        self.entry.async_on_unload(self.async_flush)
+        self.entry.async_on_unload(
+            self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STOP, self._async_handle_stop
+            )
+        )
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Persist the token once no refresh followed for a while."""
+        if self._unsub_save is None:
+            self._unsub_save = async_call_later(
+                self.hass, TOKEN_SAVE_DELAY, self._async_save_later
+            )
+
+    @callback
+    def _async_save_later(self, _now: Any) -> None:
+        """Persist the token after the save delay."""
+        self._unsub_save = None
+        self.async_flush()
+
+    @callback
+    def _async_handle_stop(self, _event: Event) -> None:
+        """Persist a pending token before Home Assistant stops."""
+        self.async_flush()
+
+    @callback
+    def async_flush(self) -> None:
+        """Write the token to the config entry if it changed."""
+        if self._unsub_save is not None:
+            self._unsub_save()
+            self._unsub_save = None
+
+        token_info = self.token_info
+        stored = self.entry.data.get(CONF_TOKEN_INFO, {})
+        if stored != self._persisted:
+            # A reauth stored a new token, never overwrite it with an older one
+            return
+        if all(
+            stored.get(key) == value
+            for key, value in token_info.items()
+            if key not in TOKEN_VOLATILE_KEYS
+        ):
+            return
+        self._persisted = token_info
+        self.hass.config_entries.async_update_entry(
+            self.entry, data={**self.entry.data, CONF_TOKEN_INFO: token_info}
+        )
@@ -0,0 +1,54 @@
+"""Support for Gimdow Lock binary sensors."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from . import TuyaConfigEntry
+from .const import DPCODE_CLOSED_OPENED, DPCODE_DOORCONTACT_STATE
+from .coordinator import GimdowCoordinator
+from .entity import GimdowEntity, async_setup_device_entities
+
+if TYPE_CHECKING:
+    from tuya_sharing import CustomerDevice
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: TuyaConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up Gimdow Lock binary sensors based on a config entry."""
+    hass_data = entry.runtime_data
+
+    def async_create_entities(device: CustomerDevice) -> list[GimdowDoorSensor]:
+        """Create the binary sensors of the data points the lock reports."""
+        if (
+            DPCODE_DOORCONTACT_STATE in device.status
+            or DPCODE_CLOSED_OPENED in device.status
+        ):
+            return [GimdowDoorSensor(device, hass_data.coordinator)]
+        return []
+
+    async_setup_device_entities(hass, entry, async_add_entities, async_create_entities)
+
+
+class GimdowDoorSensor(GimdowEntity, BinarySensorEntity):
+    """Door contact of a lock, read from the shared lock state."""
+
+    _attr_device_class = BinarySensorDeviceClass.DOOR
+    _attr_name = "Door"
+
+    def __init__(self, device: CustomerDevice, coordinator: GimdowCoordinator) -> None:
+        """Initialize the binary sensor."""
+        super().__init__(device, coordinator)
+        self._attr_unique_id = f"gimdow.{device.id}.door"
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return if the door is open."""
+        return self._lock_state.door_open
@@ -0,0 +1,86 @@
+"""Per-device command queue for Gimdow locks."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DOMAIN
+
+
+class GimdowCommandQueue:
+    """Serialize the lock commands of a single device.
+
+    Only the latest command that has not started yet is kept, so a burst of
+    lock/unlock requests collapses into a single cloud call.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        device_id: str,
+        send: Callable[[bool], Awaitable[None]],
+        on_idle: CALLBACK_TYPE,
+    ) -> None:
+        """Initialize the command queue."""
+        self._hass = hass
+        self._device_id = device_id
+        self._send = send
+        self._on_idle = on_idle
+        self._pending: bool | None = None
+        self._waiters: list[asyncio.Future[None]] = []
+        self._worker: asyncio.Task[None] | None = None
+
+    @property
+    def busy(self) -> bool:
+        """Return if a command is queued or being sent."""
+        return self._worker is not None and not self._worker.done()
+
+    async def async_submit(self, state: bool) -> None:
+        """Queue a command, replacing any command that has not started."""
+        self._pending = state
+        waiter: asyncio.Future[None] = self._hass.loop.create_future()
+        self._waiters.append(waiter)
+        if not self.busy:
+            self._worker = self._hass.async_create_task(
+                self._async_run(), f"{DOMAIN} commands {self._device_id}"
+            )
+        await waiter
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel the queued and running commands."""
+        if self._worker is not None:
+            self._worker.cancel()
+
+    async def _async_run(self) -> None:
+        """Send queued commands one at a time."""
+        last_sent: bool | None = None
+        waiters: list[asyncio.Future[None]] = []
+        try:
+            while (state := self._pending) is not None:
+                self._pending = None
+                waiters, self._waiters = self._waiters, []
+                try:
+                    if state != last_sent:
+                        await self._send(state)
+                        last_sent = state
+                except Exception as error:
+                    last_sent = None
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_exception(error)
+                    continue
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+        finally:
+            # Cancelling the worker must also release the callers of the
+            # command being sent, not only those of the queued one
+            for waiter in (*waiters, *self._waiters):
+                waiter.cancel()
+            self._waiters.clear()
+            self._pending = None
+            self._on_idle()
@@ -2,21 +2,34 @@
 
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Mapping
-from typing import Any
+import time
+from typing import TYPE_CHECKING, Any
 
+import requests
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigEntry, ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
+from homeassistant.const import CONF_SCAN_INTERVAL
+from homeassistant.core import callback
 from homeassistant.helpers import selector
 
-from tuya_sharing import LoginControl
-
+from .auth import async_import_sdk, build_token_info
 from .const import (
     CONF_ENDPOINT,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_SLOW_COMMAND_THRESHOLD,
     CONF_TERMINAL_ID,
     CONF_TOKEN_INFO,
     CONF_USER_CODE,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_SCAN_INTERVAL,
     DOMAIN,
     GIMDOW_CLIENT_ID,
     GIMDOW_RESPONSE_CODE,
@@ -25,19 +38,33 @@ from .const import (
     GIMDOW_RESPONSE_RESULT,
     GIMDOW_RESPONSE_SUCCESS,
     GIMDOW_SCHEMA,
+    LOGGER,
+    LOGIN_POLL_INTERVAL,
+    LOGIN_POLL_MAX_INTERVAL,
+    QR_CODE_LIFETIME,
 )
 
 
+if TYPE_CHECKING:
+    from tuya_sharing import LoginControl
+
+
 class GimdowConfigFlow(ConfigFlow, domain=DOMAIN):
     """Gimdow lock config flow."""
 
     __user_code: str | None = None
     __qr_code: str | None = None
     __reauth_entry: ConfigEntry | None = None
+    __login_control: LoginControl | None = None
+    __login_task: asyncio.Task[dict[str, Any] | None] | None = None
+    __login_info: dict[str, Any] | None = None
+    __qr_issued_at: float = 0.0
 
-    def __init__(self) -> None:
-        """Initialize the config flow."""
-        self.__login_control = LoginControl()
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> GimdowOptionsFlow:
+        """Get the options flow for this handler."""
+        return GimdowOptionsFlow()
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -79,61 +106,72 @@ class GimdowConfigFlow(ConfigFlow, domain=DOMAIN):
     ) -> ConfigFlowResult:
         """Handle the scanning of the QR code."""
         if user_input is None:
-            return self.async_show_form(
-                step_id="scan",
-                data_schema=vol.Schema(
-                    {
-                        vol.Optional("QR"): selector.QrCodeSelector(
-                            config=selector.QrCodeSelectorConfig(
-                                data=f"tuyaSmart--qrLogin?token={self.__qr_code}",
-                                scale=5,
-                                error_correction_level=selector.QrErrorCorrectionLevel.QUARTILE,
-                            )
-                        )
-                    }
-                ),
+            return self.__async_show_scan_form()
+        return await self.async_step_scan_wait()
+
+    async def async_step_scan_wait(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Wait until the scan of the QR code is confirmed."""
+        if self.__login_task is None:
+            self.__async_start_login_polling()
+        assert self.__login_task is not None
+        if not self.__login_task.done():
+            return self.async_show_progress(
+                step_id="scan_wait",
+                progress_action="wait_for_scan",
+                progress_task=self.__login_task,
             )
 
-        # Call the login_result method to check if the QR code scan was successful
-        ret, info = await self.hass.async_add_executor_job(
-            self.__login_control.login_result,
-            self.__qr_code,
-            GIMDOW_CLIENT_ID,
-            self.__user_code,
-        )
-        if not ret:
-            # If login failed, show a new form to allow retrying
-            await self.__async_get_qr_code(self.__user_code)
-            return self.async_show_form(
-                step_id="scan",
-                errors={"base": "login_error"},
-                data_schema=vol.Schema(
-                    {
-                        vol.Optional("QR"): selector.QrCodeSelector(
-                            config=selector.QrCodeSelectorConfig(
-                                data=f"tuyaSmart--qrLogin?token={self.__qr_code}",
-                                scale=5,
-                                error_correction_level=selector.QrErrorCorrectionLevel.QUARTILE,
-                            )
-                        )
-                    }
-                ),
+        task, self.__login_task = self.__login_task, None
+        try:
+            info = task.result()
+        except Exception:
+            LOGGER.exception("Unexpected error while waiting for the QR code scan")
+            return self.async_show_progress_done(next_step_id="scan_failed")
+        if info is None:
+            return self.async_show_progress_done(next_step_id="scan_expired")
+        self.__login_info = info
+        return self.async_show_progress_done(next_step_id="scan_done")
+
+    async def async_step_scan_expired(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Show a new QR code after the previous one expired."""
+        return await self.__async_show_new_qr_code("qr_expired")
+
+    async def async_step_scan_failed(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Show a new QR code after waiting for the scan failed."""
+        return await self.__async_show_new_qr_code("login_error")
+
+    async def __async_show_new_qr_code(self, error: str) -> ConfigFlowResult:
+        """Issue a new QR code and show it with an error."""
+        success, response = await self.__async_get_qr_code(self.__user_code)
+        if not success:
+            return self.async_abort(
+                reason="qr_code_error",
                 description_placeholders={
-                    GIMDOW_RESPONSE_MSG: info.get(GIMDOW_RESPONSE_MSG, "Unknown error"),
-                    GIMDOW_RESPONSE_CODE: info.get(GIMDOW_RESPONSE_CODE, 0),
+                    GIMDOW_RESPONSE_MSG: response.get(
+                        GIMDOW_RESPONSE_MSG, "Unknown error"
+                    ),
+                    GIMDOW_RESPONSE_CODE: response.get(GIMDOW_RESPONSE_CODE, 0),
                 },
             )
+        return self.__async_show_scan_form(errors={"base": error})
+
+    async def async_step_scan_done(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Create or update the config entry after a confirmed scan."""
+        info = self.__login_info
+        assert info is not None
 
         # Create a new config entry with the acquired data
         entry_data = {
             CONF_USER_CODE: self.__user_code,
-            CONF_TOKEN_INFO: {
-                "t": info["t"],
-                "uid": info["uid"],
-                "expire_time": info["expire_time"],
-                "access_token": info["access_token"],
-                "refresh_token": info["refresh_token"],
-            },
+            CONF_TOKEN_INFO: build_token_info(info),
             CONF_TERMINAL_ID: info[CONF_TERMINAL_ID],
             CONF_ENDPOINT: info[CONF_ENDPOINT],
         }
@@ -202,10 +240,18 @@ class GimdowConfigFlow(ConfigFlow, domain=DOMAIN):
             description_placeholders=placeholders,
         )
 
+    async def __async_get_login_control(self) -> LoginControl:
+        """Return the login control, importing the SDK on first use."""
+        if self.__login_control is None:
+            sharing = await async_import_sdk(self.hass)
+            self.__login_control = sharing.LoginControl()
+        return self.__login_control
+
     async def __async_get_qr_code(self, user_code: str) -> tuple[bool, dict[str, Any]]:
         """Get the QR code for the Gimdow lock."""
+        login_control = await self.__async_get_login_control()
         response = await self.hass.async_add_executor_job(
-            self.__login_control.qr_code,
+            login_control.qr_code,
             GIMDOW_CLIENT_ID,
             GIMDOW_SCHEMA,
             user_code,
@@ -213,4 +259,103 @@ class GimdowConfigFlow(ConfigFlow, domain=DOMAIN):
         if success := response.get(GIMDOW_RESPONSE_SUCCESS, False):
             self.__user_code = user_code
             self.__qr_code = response[GIMDOW_RESPONSE_RESULT][GIMDOW_RESPONSE_QR_CODE]
+            self.__qr_issued_at = time.monotonic()
+            self.__async_cancel_login_polling()
         return success, response
+
+    @callback
+    def __async_show_scan_form(
+        self, errors: dict[str, str] | None = None
+    ) -> ConfigFlowResult:
+        """Show the QR code and wait for the scan in the background."""
+        if self.__login_task is None:
+            self.__async_start_login_polling()
+        return self.async_show_form(
+            step_id="scan",
+            errors=errors,
+            data_schema=vol.Schema(
+                {
+                    vol.Optional("QR"): selector.QrCodeSelector(
+                        config=selector.QrCodeSelectorConfig(
+                            data=f"tuyaSmart--qrLogin?token={self.__qr_code}",
+                            scale=5,
+                            error_correction_level=selector.QrErrorCorrectionLevel.QUARTILE,
+                        )
+                    )
+                }
+            ),
+        )
+
+    @callback
+    def __async_start_login_polling(self) -> None:
+        """Start polling the login result of the current QR code."""
+        self.__login_task = self.hass.async_create_task(
+            self.__async_poll_login_result(), f"{DOMAIN} QR login"
+        )
+
+    @callback
+    def __async_cancel_login_polling(self) -> None:
+        """Stop polling the login result of a replaced QR code."""
+        if self.__login_task is not None:
+            self.__login_task.cancel()
+            self.__login_task = None
+
+    async def __async_poll_login_result(self) -> dict[str, Any] | None:
+        """Return the login info once the QR code is scanned, None if it expired."""
+        login_control = await self.__async_get_login_control()
+        delay = LOGIN_POLL_INTERVAL
+        while time.monotonic() - self.__qr_issued_at < QR_CODE_LIFETIME:
+            try:
+                ret, info = await self.hass.async_add_executor_job(
+                    login_control.login_result,
+                    self.__qr_code,
+                    GIMDOW_CLIENT_ID,
+                    self.__user_code,
+                )
+            except (requests.RequestException, ValueError) as err:
+                LOGGER.debug("Failed to get the QR login result: %s", err)
+            else:
+                if ret:
+                    return info
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LOGIN_POLL_MAX_INTERVAL)
+        return None
+
+    @callback
+    def async_remove(self) -> None:
+        """Stop polling when the flow is removed."""
+        self.__async_cancel_login_polling()
+
+
+class GimdowOptionsFlow(OptionsFlow):
+    """Gimdow lock options flow."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the polling options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_SCAN_INTERVAL,
+                        default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=30)),
+                    vol.Required(
+                        CONF_MAX_CONCURRENT_REQUESTS,
+                        default=options.get(
+                            CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=20)),
+                    vol.Required(
+                        CONF_SLOW_COMMAND_THRESHOLD,
+                        default=options.get(CONF_SLOW_COMMAND_THRESHOLD, 0),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                }
+            ),
+        )
@@ -13,14 +13,122 @@ CONF_ENDPOINT = "endpoint"
 CONF_TERMINAL_ID = "terminal_id"
 CONF_TOKEN_INFO = "token_info"
 CONF_USER_CODE = "user_code"
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+CONF_SLOW_COMMAND_THRESHOLD = "slow_command_threshold"
+
+# Polling defaults
+DEFAULT_SCAN_INTERVAL = 300  # seconds
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+
+# Circuit breakers of the cloud request gateway
+CIRCUIT_BREAKER_THRESHOLD = 3  # failed requests, after all retries
+CIRCUIT_BREAKER_RESET_TIMEOUT = 60  # seconds
+
+# Connections kept alive per endpoint, shared by all entries of the endpoint
+SESSION_POOL_MAXSIZE = 20
+
+# Adaptive polling of the log fallback, per lock
+POLL_ACTIVE_INTERVAL = 15  # seconds, right after a command or pushed update
+POLL_MAX_INTERVAL = 60 * 60  # seconds, ceiling of the idle backoff
 
 # Authentication details
 GIMDOW_CLIENT_ID = "HA_3y9q4ak7g4ephrvke"  # Example client ID for Gimdow
 GIMDOW_SCHEMA = "haauthorize"
 
+# QR code login
+QR_CODE_LIFETIME = 120  # seconds
+LOGIN_POLL_INTERVAL = 1.0  # seconds, doubled after every pending poll
+LOGIN_POLL_MAX_INTERVAL = 5.0  # seconds
+
+# Cloud request gateway
+API_ENDPOINT_DEVICE_DETAIL = "device-detail"
+API_ENDPOINT_DOOR_OPERATE = "door-operate"
+API_ENDPOINT_LOGS = "logs"
+API_ENDPOINT_PASSWORD_TICKET = "password-ticket"
+API_ENDPOINT_PROBE = "probe"
+API_PROBE_PATH = "/v1.0/m/life/users/homes"
+API_MAX_ATTEMPTS = 4
+API_REQUEST_TIMEOUT = 10  # seconds, per HTTP request
+API_BACKOFF_BASE = 1.0  # seconds
+API_BACKOFF_MAX = 30.0  # seconds
+# Requests per second and burst size of each endpoint, per account
+DEFAULT_API_RATE_LIMIT = (2.0, 5)
+API_RATE_LIMITS = {
+    API_ENDPOINT_DOOR_OPERATE: (5.0, 10),
+    API_ENDPOINT_LOGS: (2.0, 5),
+    API_ENDPOINT_PASSWORD_TICKET: (5.0, 10),
+}
+GIMDOW_AUTH_ERROR_CODES = {1004, 1010}  # sign invalid, token invalid
+GIMDOW_TRANSIENT_ERROR_CODES = {500}  # system error
+GIMDOW_DEVICE_OFFLINE_CODES = {2001}  # device is offline
+
+# Request metrics
+METRICS_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # seconds
+METRICS_MQ_RATE_WINDOW = 300  # seconds
+METRICS_ENDPOINT_COMMAND = "command"
+METRICS_ENDPOINT_REFRESH_MQ = "refresh_mq"
+METRICS_ENDPOINT_UPDATE_DEVICE_CACHE = "update_device_cache"
+
 # Signal and discovery constants
 GIMDOW_DISCOVERY_NEW = "gimdow_discovery_new"
+GIMDOW_DISCOVERY_REMOVED = "gimdow_discovery_removed"
 GIMDOW_HA_SIGNAL_UPDATE_ENTITY = "gimdow_entry_update"
+GIMDOW_HA_SIGNAL_LOCK_EVENT = "gimdow_lock_event"
+
+# Device categories handled as locks
+LOCK_CATEGORIES = {"jtmspro", "lock"}
+
+# Status data points (DPs) reported by the locks
+DPCODE_BATTERY_STATE = "battery_state"
+DPCODE_CLOSED_OPENED = "closed_opened"
+DPCODE_DOORCONTACT_STATE = "doorcontact_state"
+DPCODE_LOCK_MOTOR_STATE = "lock_motor_state"
+DPCODE_RESIDUAL_ELECTRICITY = "residual_electricity"
+
+# Fall back to the device logs when the pushed status is older than this
+STATUS_STALE_AFTER = 6 * 60 * 60  # seconds
+
+# Refreshed tokens are written to the config entry after this delay
+TOKEN_SAVE_DELAY = 60  # seconds
+
+# Password tickets used for lock commands
+TICKET_DEFAULT_LIFETIME = 60  # seconds, used when the cloud omits expire_time
+TICKET_REFRESH_MARGIN = 15  # seconds before expiry a cached ticket is no longer used
+TICKET_ACTIVE_WINDOW = 5 * 60  # seconds after a command the ticket is kept fresh
+
+# Keep an optimistic lock state until the lock confirms it or this passes
+COMMAND_CONFIRM_TIMEOUT = 30  # seconds
+
+# Pushed updates arriving within this window are applied together
+MQ_UPDATE_COALESCE_WINDOW = 0.25  # seconds
+# Protocol of the MQ messages reporting device status properties
+MQ_PROTOCOL_DEVICE_REPORT = 4
+
+# Command latency traces kept for diagnostics
+TRACE_BUFFER_SIZE = 50
+
+# Retry interval for the background device refresh after a snapshot start
+DEVICE_CACHE_RETRY_INTERVAL = 60  # seconds
+
+# Persistent storage
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10  # seconds
+
+# Device logs
+LOG_MAX_AGE_DAYS = 7  # The cloud only keeps a week of device logs
+LOG_PAGE_SIZE = 100
+
+# Device status resync, used instead of the logs while MQ is down or reconnected
+DEVICE_DETAIL_BATCH_SIZE = 20  # devices per request
+
+# Local access event history
+HISTORY_MAX_EVENTS = 200  # per lock
+HISTORY_DEDUPE_WINDOW = 5_000  # milliseconds, same event pushed and logged
+
+# Services
+SERVICE_GET_EVENT_HISTORY = "get_event_history"
+ATTR_LIMIT = "limit"
+ATTR_SINCE = "since"
 
 # Response fields for login flow
 GIMDOW_RESPONSE_CODE = "code"
@@ -30,4 +138,9 @@ GIMDOW_RESPONSE_RESULT = "result"
 GIMDOW_RESPONSE_SUCCESS = "success"
 
 # Supported platforms for the Gimdow Lock integration
-PLATFORMS = [Platform.LOCK]
+PLATFORMS = [
+    Platform.BINARY_SENSOR,
+    Platform.EVENT,
+    Platform.LOCK,
+    Platform.SENSOR,
+]
@@ -0,0 +1,506 @@
+"""Data update coordinator for the Gimdow Lock integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable, Mapping
+from contextlib import aclosing
+from dataclasses import dataclass
+from datetime import timedelta
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import CONF_SCAN_INTERVAL
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .api import GimdowApiError, GimdowApiGateway, GimdowAuthError
+from .const import (
+    COMMAND_CONFIRM_TIMEOUT,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_SLOW_COMMAND_THRESHOLD,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    DPCODE_BATTERY_STATE,
+    DPCODE_CLOSED_OPENED,
+    DPCODE_DOORCONTACT_STATE,
+    DPCODE_LOCK_MOTOR_STATE,
+    DPCODE_RESIDUAL_ELECTRICITY,
+    GIMDOW_HA_SIGNAL_UPDATE_ENTITY,
+    LOCK_CATEGORIES,
+    LOG_MAX_AGE_DAYS,
+    LOGGER,
+    POLL_ACTIVE_INTERVAL,
+    POLL_MAX_INTERVAL,
+    STATUS_STALE_AFTER,
+)
+from .history import GimdowEventHistory, LockEvent
+from .logs import LOCK_EVENTS, LockLogReducer, async_iter_log_pages
+from .metrics import GimdowMetrics
+from .status import async_iter_device_details, device_detail_status
+from .storage import GimdowDeviceSnapshotStore, GimdowLogCursorStore
+from .tracing import GimdowCommandTracer
+
+if TYPE_CHECKING:
+    from tuya_sharing import Manager
+
+# Status DPs kept in the device snapshot, the lock state is stored on its own.
+# The access DPs are kept so a snapshot start creates the same entities.
+SNAPSHOT_DPCODES = (
+    DPCODE_BATTERY_STATE,
+    DPCODE_CLOSED_OPENED,
+    DPCODE_DOORCONTACT_STATE,
+    DPCODE_RESIDUAL_ELECTRICITY,
+    *LOCK_EVENTS,
+)
+
+
+@dataclass(slots=True)
+class GimdowLockState:
+    """State of a single Gimdow lock."""
+
+    is_locked: bool | None = None
+    last_timestamp: int | None = None
+    battery_level: int | None = None
+    battery_state: str | None = None
+    door_open: bool | None = None
+    # Monotonic time the lock state was last read from the device status
+    status_updated: float | None = None
+    # Target of the command that is queued or being sent
+    command_target: bool | None = None
+    # Monotonic time an optimistic lock state was set, cleared once confirmed
+    optimistic_since: float | None = None
+    # Current interval of the log fallback and monotonic time it is due
+    poll_interval: float | None = None
+    next_poll: float | None = None
+
+    def set_locked(self, is_locked: bool) -> bool:
+        """Set the reported lock state, keeping an unconfirmed optimistic state.
+
+        Return if the reported state confirmed the optimistic state.
+        """
+        confirmed = False
+        if self.optimistic_since is not None:
+            if (
+                is_locked != self.is_locked
+                and time.monotonic() - self.optimistic_since < COMMAND_CONFIRM_TIMEOUT
+            ):
+                return False
+            confirmed = is_locked == self.is_locked
+            self.optimistic_since = None
+        self.is_locked = is_locked
+        return confirmed
+
+
+def decode_status(state: GimdowLockState, status: Mapping[str, Any]) -> bool:
+    """Update a lock state from the status data points of the device.
+
+    Return if the status confirmed the optimistic lock state.
+    """
+    confirmed = False
+    if (locked := status.get(DPCODE_LOCK_MOTOR_STATE)) is not None:
+        # The motor reports true while the bolt is thrown
+        confirmed = state.set_locked(bool(locked))
+        state.status_updated = time.monotonic()
+    if (battery_level := status.get(DPCODE_RESIDUAL_ELECTRICITY)) is not None:
+        state.battery_level = int(battery_level)
+    if (battery_state := status.get(DPCODE_BATTERY_STATE)) is not None:
+        state.battery_state = str(battery_state)
+    if (door_open := status.get(DPCODE_DOORCONTACT_STATE)) is not None:
+        state.door_open = bool(door_open)
+    elif (closed_opened := status.get(DPCODE_CLOSED_OPENED)) in ("open", "closed"):
+        state.door_open = closed_opened == "open"
+    return confirmed
+
+
+class GimdowCoordinator(DataUpdateCoordinator[dict[str, GimdowLockState]]):
+    """Poll the state of every Gimdow lock of a config entry in one batch.
+
+    Each lock has its own poll interval: short right after a command or pushed
+    update, doubling on every poll that finds nothing new. The coordinator is
+    scheduled for the lock that is due first, and locks whose state arrives
+    over MQ are not polled at all.
+
+    Due locks first get their status in batches of DEVICE_DETAIL_BATCH_SIZE.
+    Only the locks whose status does not report the lock state read their logs.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        manager: Manager,
+        gateway: GimdowApiGateway,
+        log_cursors: GimdowLogCursorStore,
+        snapshot: GimdowDeviceSnapshotStore,
+        history: GimdowEventHistory,
+        metrics: GimdowMetrics,
+        options: Mapping[str, Any],
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(hass, LOGGER, name=DOMAIN)
+        self.manager = manager
+        self.gateway = gateway
+        self.log_cursors = log_cursors
+        self.snapshot = snapshot
+        self.history = history
+        self.tracer = GimdowCommandTracer()
+        self.metrics = metrics
+        self._semaphore = asyncio.Semaphore(DEFAULT_MAX_CONCURRENT_REQUESTS)
+        self._scan_interval: float = DEFAULT_SCAN_INTERVAL
+        self._states: dict[str, GimdowLockState] = {}
+        # Last seen MQ connection state, None until MQ is started
+        self._mq_was_connected: bool | None = None
+        self.async_apply_options(options)
+
+    @callback
+    def async_apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply the polling options of the config entry."""
+        self._scan_interval = options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        self.update_interval = timedelta(seconds=self._scan_interval)
+        self._semaphore = asyncio.Semaphore(
+            options.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS)
+        )
+        self.tracer.slow_threshold = options.get(CONF_SLOW_COMMAND_THRESHOLD)
+
+    @property
+    def mq_connected(self) -> bool:
+        """Return if the real-time MQ connection is up."""
+        if (mq := self.manager.mq) is None:
+            return False
+        client = getattr(mq, "client", None)
+        return client is not None and client.is_connected()
+
+    @property
+    def lock_device_ids(self) -> list[str]:
+        """Return the IDs of all lock devices of the account."""
+        return [
+            device.id
+            for device in self.manager.device_map.values()
+            if device.category in LOCK_CATEGORIES
+        ]
+
+    def get_state(self, device_id: str) -> GimdowLockState:
+        """Return the state of a lock, seeding it from the stored cursor."""
+        if (state := self._states.get(device_id)) is None:
+            state = self._states[device_id] = GimdowLockState(
+                is_locked=self.log_cursors.get_is_locked(device_id),
+                last_timestamp=self.log_cursors.get_timestamp(device_id),
+            )
+            if (device := self.manager.device_map.get(device_id)) is not None:
+                decode_status(state, device.status)
+        return state
+
+    @callback
+    def async_check_mq_connection(self) -> None:
+        """Resync the status of all locks once MQ is (re)connected.
+
+        Updates pushed while MQ was down are lost, so no status can be trusted.
+        """
+        if self.manager.mq is None:
+            return
+        connected = self.mq_connected
+        was_connected, self._mq_was_connected = self._mq_was_connected, connected
+        if not connected or was_connected:
+            return
+        LOGGER.debug("MQ connected, resyncing the status of all locks")
+        for state in self._states.values():
+            state.status_updated = None
+            state.next_poll = None
+        self._async_schedule_next_poll(time.monotonic())
+        if self._listeners:
+            self._schedule_refresh()
+
+    @callback
+    def async_handle_device_updates(self, device_ids: Iterable[str]) -> None:
+        """Apply status updates pushed over MQ and notify the entities."""
+        self.async_check_mq_connection()
+        for device_id in device_ids:
+            if (device := self.manager.device_map.get(device_id)) is None:
+                continue
+            state = self.get_state(device_id)
+            if decode_status(state, device.status):
+                self.tracer.confirm(device_id, "mq")
+            self._async_mark_active(state)
+            async_dispatcher_send(
+                self.hass, f"{GIMDOW_HA_SIGNAL_UPDATE_ENTITY}_{device_id}"
+            )
+        self.snapshot.async_schedule_save(self._snapshot_data())
+
+    @callback
+    def async_remove_device(self, device_id: str) -> None:
+        """Forget the state of a device that left the account."""
+        self._states.pop(device_id, None)
+        self.history.async_remove_device(device_id)
+
+    @callback
+    def async_reload_status(self) -> None:
+        """Decode the status of every lock again after a device cache refresh."""
+        for device_id, state in self._states.items():
+            if (device := self.manager.device_map.get(device_id)) is not None:
+                state.status_updated = None
+                if decode_status(state, device.status):
+                    self.tracer.confirm(device_id, "status")
+        self.async_update_listeners()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all listeners and schedule saving the device snapshot."""
+        super().async_update_listeners()
+        self.snapshot.async_schedule_save(self._snapshot_data())
+
+    @callback
+    def _snapshot_data(self) -> list[dict[str, Any]]:
+        """Return a compact snapshot of the account's devices."""
+        return [
+            {
+                "id": device.id,
+                "name": device.name,
+                "category": device.category,
+                "product_id": device.product_id,
+                "product_name": device.product_name,
+                "online": device.online,
+                "status": {
+                    code: device.status[code]
+                    for code in SNAPSHOT_DPCODES
+                    if code in device.status
+                },
+                "is_locked": (
+                    self._states[device.id].is_locked
+                    if device.id in self._states
+                    else None
+                ),
+            }
+            for device in self.manager.device_map.values()
+        ]
+
+    def _needs_log_fallback(self, state: GimdowLockState) -> bool:
+        """Return if the lock state has to be read from the device logs."""
+        if state.status_updated is None:
+            return True
+        age = time.monotonic() - state.status_updated
+        if self.mq_connected:
+            return age > STATUS_STALE_AFTER
+        # Without MQ the status is only current right after a device cache refresh
+        return age > self._scan_interval
+
+    @callback
+    def _async_mark_active(self, state: GimdowLockState) -> None:
+        """Poll a lock soon after it was used."""
+        if not self._needs_log_fallback(state):
+            return
+        now = time.monotonic()
+        state.poll_interval = POLL_ACTIVE_INTERVAL
+        due = now + POLL_ACTIVE_INTERVAL
+        if state.next_poll is not None and state.next_poll <= due:
+            return
+        state.next_poll = due
+        self._async_schedule_next_poll(now)
+        if self._listeners:
+            self._schedule_refresh()
+
+    def _can_poll(self, device_id: str) -> bool:
+        """Return if a lock is online and its requests are sent."""
+        device = self.manager.device_map.get(device_id)
+        if device is not None and not device.online:
+            return False
+        return self.gateway.is_available(device_id)
+
+    @callback
+    def _async_schedule_next_poll(self, now: float) -> None:
+        """Schedule the coordinator for the lock that is due first.
+
+        Offline locks and locks whose requests are held back are left out, they
+        are checked again at the scan interval.
+        """
+        due = [
+            now if state.next_poll is None else state.next_poll
+            for device_id in self.lock_device_ids
+            if self._can_poll(device_id)
+            and self._needs_log_fallback(state := self.get_state(device_id))
+        ]
+        # Without a due lock, only check again for states that went stale
+        delay = min(due) - now if due else self._scan_interval
+        self.update_interval = timedelta(
+            seconds=min(max(delay, POLL_ACTIVE_INTERVAL), POLL_MAX_INTERVAL)
+        )
+
+    @callback
+    def async_start_reauth(self) -> None:
+        """Start a reauth flow for the config entry of the coordinator."""
+        if self.config_entry is not None:
+            self.config_entry.async_start_reauth(self.hass)
+
+    @callback
+    def async_set_command_target(self, device_id: str, target: bool | None) -> None:
+        """Set the target of the queued command, or None once the queue is idle."""
+        self.get_state(device_id).command_target = target
+        self.async_update_listeners()
+
+    @callback
+    def async_set_lock_state(self, device_id: str, is_locked: bool) -> None:
+        """Set an optimistic lock state after a successful command."""
+        state = self.get_state(device_id)
+        state.is_locked = is_locked
+        state.optimistic_since = time.monotonic()
+        # Confirm the command quickly if the lock does not push its state
+        self._async_mark_active(state)
+        self.async_update_listeners()
+
+    async def _async_update_data(self) -> dict[str, GimdowLockState]:
+        """Fetch the state of all locks."""
+        self.async_check_mq_connection()
+        device_ids = self.lock_device_ids
+        try:
+            resynced = await self._async_resync_status(device_ids)
+            results = await asyncio.gather(
+                *(self._async_update_lock(device_id) for device_id in device_ids)
+            )
+        except GimdowAuthError as err:
+            raise ConfigEntryAuthFailed(str(err)) from err
+        finally:
+            self._async_schedule_next_poll(time.monotonic())
+        if not resynced:
+            raise UpdateFailed("Failed to fetch the status of the Gimdow locks")
+        if device_ids and not any(results):
+            raise UpdateFailed("Failed to fetch the logs of all Gimdow locks")
+        return {device_id: self.get_state(device_id) for device_id in device_ids}
+
+    async def _async_resync_status(self, device_ids: list[str]) -> bool:
+        """Read the status of the locks due for a poll, in as few requests as possible.
+
+        Return False if the status could not be fetched. The due locks are then
+        retried at their current interval instead of reading all their logs.
+        """
+        now = time.monotonic()
+        due = [
+            device_id
+            for device_id in device_ids
+            if self.manager.device_map[device_id].online
+            and self._needs_log_fallback(state := self.get_state(device_id))
+            and (state.next_poll is None or now + 1 >= state.next_poll)
+        ]
+        if not due or not self.gateway.is_available():
+            return True
+
+        try:
+            async with self._semaphore:
+                async with aclosing(
+                    async_iter_device_details(self.gateway, due)
+                ) as batches:
+                    async for details in batches:
+                        self._apply_device_details(details)
+        except GimdowAuthError:
+            raise
+        except GimdowApiError as error:
+            LOGGER.error("Error fetching device status: %s", error)
+            now = time.monotonic()
+            for device_id in due:
+                state = self.get_state(device_id)
+                if self._needs_log_fallback(state):
+                    state.next_poll = now + (state.poll_interval or self._scan_interval)
+            return False
+        return True
+
+    @callback
+    def _apply_device_details(self, details: list[dict[str, Any]]) -> None:
+        """Apply the fetched status of a batch of locks."""
+        for detail in details:
+            if (device := self.manager.device_map.get(detail.get("id", ""))) is None:
+                continue
+            status = device_detail_status(detail)
+            device.status.update(status)
+            if (online := detail.get("online")) is not None:
+                device.online = bool(online)
+            if decode_status(self.get_state(device.id), status):
+                self.tracer.confirm(device.id, "status")
+
+    async def _async_update_lock(self, device_id: str) -> bool:
+        """Fetch and apply the new log entries of a single lock when it is due."""
+        device = self.manager.device_map.get(device_id)
+        if device is not None and not device.online:
+            # Nothing changes while the lock is offline
+            return True
+        if not self.gateway.is_available(device_id):
+            return False
+        state = self.get_state(device_id)
+        if not self._needs_log_fallback(state):
+            # The pushed status is current, no need to poll
+            state.poll_interval = state.next_poll = None
+            return True
+        # Allow for the coordinator firing slightly before the lock is due
+        if state.next_poll is not None and time.monotonic() + 1 < state.next_poll:
+            return True
+
+        async with self._semaphore:
+            reducer = await self._async_fetch_device_logs(device_id, state.last_timestamp)
+        interval = state.poll_interval or self._scan_interval
+        if reducer is None:
+            # Retry failures at the current interval
+            state.next_poll = time.monotonic() + interval
+            return False
+
+        if reducer.newest_timestamp != (state.last_timestamp or 0):
+            # Keep polling an active lock quickly
+            interval = POLL_ACTIVE_INTERVAL
+        else:
+            interval = min(interval * 2, max(POLL_MAX_INTERVAL, self._scan_interval))
+        state.poll_interval = interval
+        state.next_poll = time.monotonic() + interval
+        self._apply_log_reducer(device_id, reducer)
+        return True
+
+    async def _async_fetch_device_logs(
+        self, device_id: str, last_timestamp: int | None
+    ) -> LockLogReducer | None:
+        """Stream the lock's logs newer than the last processed entry into a reducer."""
+        now = dt_util.utcnow()
+        end_time = int(now.timestamp() * 1000)
+        start_time = int((now - timedelta(days=LOG_MAX_AGE_DAYS)).timestamp() * 1000)
+        if last_timestamp is not None:
+            start_time = max(start_time, last_timestamp + 1)
+
+        reducer = LockLogReducer(last_timestamp)
+        try:
+            async with aclosing(
+                async_iter_log_pages(self.gateway, device_id, start_time, end_time)
+            ) as pages:
+                async for logs in pages:
+                    # Read back to the cursor so the history gets every access
+                    # event; without one, stop once the lock state is decided
+                    if reducer.feed(logs) and last_timestamp is None:
+                        break
+        except GimdowAuthError:
+            raise
+        except GimdowApiError as error:
+            LOGGER.error("Error fetching device logs: %s", error)
+            return None
+        return reducer
+
+    @callback
+    def _apply_log_reducer(self, device_id: str, reducer: LockLogReducer) -> None:
+        """Apply the lock state decided from the logs."""
+        state = self.get_state(device_id)
+        if reducer.newest_timestamp == (state.last_timestamp or 0):
+            LOGGER.debug("No new logs for device: %s", device_id)
+            return
+
+        # Only ask for entries after this one on the next poll
+        state.last_timestamp = reducer.newest_timestamp
+        if reducer.events:
+            self.history.async_add(device_id, map(LockEvent.from_log, reducer.events))
+
+        if (is_locked := reducer.is_locked) is not None:
+            # The newest decisive log entry determines the lock state
+            if state.set_locked(is_locked):
+                self.tracer.confirm(device_id, "logs")
+            LOGGER.info(
+                "Updated lock state for %s based on logs: %s",
+                device_id,
+                reducer.latest_entry,
+            )
+
+        self.log_cursors.async_set(device_id, reducer.newest_timestamp, is_locked)
@@ -0,0 +1,36 @@
+"""Diagnostics support for the Gimdow Lock integration."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.core import HomeAssistant
+
+from . import TuyaConfigEntry
+from .const import CONF_TERMINAL_ID, CONF_TOKEN_INFO, CONF_USER_CODE
+
+TO_REDACT = {CONF_TERMINAL_ID, CONF_TOKEN_INFO, CONF_USER_CODE}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: TuyaConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    gimdow = entry.runtime_data
+    coordinator = gimdow.coordinator
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "mq_connected": coordinator.mq_connected,
+        "cloud_available": coordinator.gateway.is_available(),
+        "locks": {
+            device_id: asdict(coordinator.get_state(device_id))
+            for device_id in coordinator.lock_device_ids
+        },
+        "metrics": gimdow.metrics.as_dict(),
+        "command_traces": coordinator.tracer.as_list(),
+    }
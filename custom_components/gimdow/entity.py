@@ -0,0 +1,123 @@
+"""Base entity for the Gimdow Lock integration."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from . import TuyaConfigEntry
+from .const import (
+    DOMAIN,
+    GIMDOW_DISCOVERY_NEW,
+    GIMDOW_DISCOVERY_REMOVED,
+    GIMDOW_HA_SIGNAL_UPDATE_ENTITY,
+    LOCK_CATEGORIES,
+    LOGGER,
+)
+from .coordinator import GimdowCoordinator, GimdowLockState
+
+if TYPE_CHECKING:
+    from tuya_sharing import CustomerDevice
+
+
+class GimdowEntity(CoordinatorEntity[GimdowCoordinator]):
+    """Base class for the entities of a Gimdow lock."""
+
+    _attr_has_entity_name = True
+
+    def __init__(self, device: CustomerDevice, coordinator: GimdowCoordinator) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._device_id = device.id
+        self._initial_device = device
+        self._device_manager = coordinator.manager
+
+    @property
+    def _device(self) -> CustomerDevice:
+        """Return the current device, which is replaced on a device cache refresh."""
+        return self._device_manager.device_map.get(self._device_id, self._initial_device)
+
+    @property
+    def _lock_state(self) -> GimdowLockState:
+        """Return the shared state of the lock."""
+        return self.coordinator.get_state(self._device_id)
+
+    @property
+    def available(self) -> bool:
+        """Return if the lock is available."""
+        return self._device.online
+
+    @property
+    def device_info(self) -> dict[str, Any]:
+        """Return a device description for device registry."""
+        return {
+            "identifiers": {(DOMAIN, self._device.id)},
+            "manufacturer": "Gimdow",
+            "name": self._device.name,
+            "model": self._device.product_name,
+            "model_id": self._device.product_id,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Call when entity is added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                f"{GIMDOW_HA_SIGNAL_UPDATE_ENTITY}_{self._device_id}",
+                self.async_write_ha_state,
+            )
+        )
+
+
+@callback
+def async_setup_device_entities(
+    hass: HomeAssistant,
+    entry: TuyaConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    entity_factory: Callable[[CustomerDevice], Sequence[Entity]],
+) -> None:
+    """Create the entities of every lock and follow added and removed locks."""
+    manager = entry.runtime_data.manager
+    entities: dict[str, Sequence[Entity]] = {}
+
+    @callback
+    def async_discover_device(device_ids: list[str]) -> None:
+        """Add entities for newly discovered locks."""
+        new_entities: list[Entity] = []
+        for device_id in device_ids:
+            if device_id in entities:
+                continue
+            device = manager.device_map.get(device_id)
+            if device is not None and device.category in LOCK_CATEGORIES:
+                LOGGER.debug("Setting up entities for Gimdow Lock: %s", device.id)
+                device_entities = entities[device_id] = entity_factory(device)
+                for entity in device_entities:
+                    entity.async_on_remove(partial(entities.pop, device_id, None))
+                new_entities.extend(device_entities)
+
+        if new_entities:
+            async_add_entities(new_entities)
+
+    @callback
+    def async_remove_device(device_id: str) -> None:
+        """Remove the entities of a lock that left the account."""
+        for entity in entities.pop(device_id, ()):
+            LOGGER.debug("Removing %s of Gimdow Lock: %s", entity.entity_id, device_id)
+            hass.async_create_task(entity.async_remove(force_remove=True))
+
+    async_discover_device([*manager.device_map])
+
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, GIMDOW_DISCOVERY_NEW, async_discover_device)
+    )
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, GIMDOW_DISCOVERY_REMOVED, async_remove_device)
+    )
@@ -0,0 +1,68 @@
+"""Support for Gimdow Lock access events."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.components.event import EventEntity
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from . import TuyaConfigEntry
+from .const import GIMDOW_HA_SIGNAL_LOCK_EVENT
+from .coordinator import GimdowCoordinator
+from .entity import GimdowEntity, async_setup_device_entities
+from .history import EVENT_TYPES, LockEvent
+
+if TYPE_CHECKING:
+    from tuya_sharing import CustomerDevice
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: TuyaConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up Gimdow Lock events based on a config entry."""
+    hass_data = entry.runtime_data
+    async_setup_device_entities(
+        hass,
+        entry,
+        async_add_entities,
+        lambda device: [GimdowAccessEvent(device, hass_data.coordinator)],
+    )
+
+
+class GimdowAccessEvent(GimdowEntity, EventEntity):
+    """Access events of a lock, fired from the local event history."""
+
+    _attr_event_types = sorted(EVENT_TYPES)
+    _attr_name = "Access"
+
+    def __init__(self, device: CustomerDevice, coordinator: GimdowCoordinator) -> None:
+        """Initialize the event entity."""
+        super().__init__(device, coordinator)
+        self._attr_unique_id = f"gimdow.{device.id}.access"
+        # Older events added later from the device logs are not fired again
+        events = coordinator.history.get(device.id, limit=1)
+        self._last_time = events[0].time if events else 0
+
+    async def async_added_to_hass(self) -> None:
+        """Call when entity is added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                f"{GIMDOW_HA_SIGNAL_LOCK_EVENT}_{self._device_id}",
+                self._async_handle_event,
+            )
+        )
+
+    @callback
+    def _async_handle_event(self, event: LockEvent) -> None:
+        """Fire a new access event."""
+        if event.time <= self._last_time:
+            return
+        self._last_time = event.time
+        self._trigger_event(
+            event.event, {"value": event.value, "source": event.source}
+        )
+        self.async_write_ha_state()
@@ -1,148 +1,191 @@
 """Support for Gimdow Lock devices."""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Any
-
-from tuya_sharing import CustomerDevice, Manager
+import time
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.lock import LockEntity
 from homeassistant.core import callback
-from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.exceptions import HomeAssistantError
 
+from .api import GimdowApiError, GimdowAuthError, GimdowUnavailableError
 from .const import (
+    API_ENDPOINT_DOOR_OPERATE,
     DOMAIN,
     LOGGER,
-    GIMDOW_DISCOVERY_NEW,
-    GIMDOW_HA_SIGNAL_UPDATE_ENTITY,
+    METRICS_ENDPOINT_COMMAND,
 )
+from .commands import GimdowCommandQueue
+from .coordinator import GimdowCoordinator
+from .entity import GimdowEntity
+from .tickets import PasswordTicketCache
+from .tracing import TRACE_OUTCOME_FAILED, TRACE_OUTCOME_SENT, CommandTrace
 
-LOCK_LOG_PRIORITY = {
-    'lock_record': 5,
-    'unlock_key': 4,
-    'manual_lock': 3,
-    'unlock_ble': 2,
-    'unlock_phone_remote': 1,
-}
+if TYPE_CHECKING:
+    from tuya_sharing import CustomerDevice
 
 
-class GimdowLock(LockEntity):
+class GimdowLock(GimdowEntity, LockEntity):
     """Representation of a Gimdow Lock."""
 
-    _attr_has_entity_name = True
-
-    def __init__(self, device: CustomerDevice, device_manager: Manager) -> None:
+    def __init__(
+        self,
+        device: CustomerDevice,
+        coordinator: GimdowCoordinator,
+        tickets: PasswordTicketCache,
+    ) -> None:
         """Initialize the Gimdow Lock."""
-        self._device = device
-        self._device_manager = device_manager
+        super().__init__(device, coordinator)
+        self._tickets = tickets
+        self._commands: GimdowCommandQueue | None = None
+        # Time the oldest command that has not started yet was requested
+        self._queued_at: float | None = None
         self._attr_unique_id = f"gimdow.{device.id}"
         self._attr_name = device.name
-        self._attr_is_locked = False
-        self._lock_state_last_timestamp = None
 
     @property
-    def available(self) -> bool:
-        """Return if the lock is available."""
-        return self._device.online
+    def is_locked(self) -> bool | None:
+        """Return true if the lock is locked."""
+        return self._lock_state.is_locked
 
     @property
-    def device_info(self) -> dict[str, Any]:
-        """Return a device description for device registry."""
-        return {
-            "identifiers": {(DOMAIN, self._device.id)},
-            "manufacturer": "Gimdow",
-            "name": self._device.name,
-            "model": self._device.product_name,
-            "model_id": self._device.product_id,
-        }
+    def is_locking(self) -> bool:
+        """Return true if a lock command is in progress."""
+        return self._lock_state.command_target is True
 
     @property
-    def is_locked(self) -> bool:
-        """Return true if the lock is locked."""
-        return self._attr_is_locked
+    def is_unlocking(self) -> bool:
+        """Return true if an unlock command is in progress."""
+        return self._lock_state.command_target is False
 
-    def lock(self, **kwargs: Any) -> None:
+    async def async_lock(self, **kwargs: Any) -> None:
         """Lock the device."""
         LOGGER.debug("Locking the Gimdow lock: %s", self._device.id)
-        self._send_command(True)
+        await self._async_queue_command(True)
 
-    def unlock(self, **kwargs: Any) -> None:
+    async def async_unlock(self, **kwargs: Any) -> None:
         """Unlock the device."""
         LOGGER.debug("Unlocking the Gimdow lock: %s", self._device.id)
-        self._send_command(False)
+        await self._async_queue_command(False)
+
+    async def _async_queue_command(self, state: bool) -> None:
+        """Queue a command, replacing any command that has not started yet."""
+        assert self._commands is not None
+        if self._queued_at is None:
+            self._queued_at = time.monotonic()
+        self.coordinator.async_set_command_target(self._device.id, state)
+        await self._commands.async_submit(state)
+
+    async def _async_execute_command(self, state: bool) -> None:
+        """Send a queued command and apply its optimistic state."""
+        start = time.monotonic()
+        tracer = self.coordinator.tracer
+        trace = tracer.start(
+            self._device.id, "lock" if state else "unlock", self._queued_at or start
+        )
+        trace.add_span("queue", trace.queued_at, start)
+        self._queued_at = None
 
-    def _send_command(self, state: bool) -> None:
-        """Send the lock/unlock command to the device."""
+        if not self._device.online:
+            tracer.finish(trace, TRACE_OUTCOME_FAILED)
+            raise HomeAssistantError(f"{self._device.name} is offline")
         try:
-            # Step 1: Request a password ticket
-            ticket_response = self._device_manager.customer_api.post(
-                f"/v1.0/smart-lock/devices/{self._device.id}/password-ticket"
+            # Fail right away instead of waiting for an unreachable cloud or lock
+            self.coordinator.gateway.check_available(self._device.id)
+            success = await self._async_send_command(state, trace)
+        except GimdowAuthError as err:
+            tracer.finish(trace, TRACE_OUTCOME_FAILED)
+            self.coordinator.metrics.record(
+                METRICS_ENDPOINT_COMMAND, time.monotonic() - start, True, self._device.id
             )
+            self.coordinator.async_start_reauth()
+            raise HomeAssistantError(
+                f"Authentication failed while sending a command to {self._device.name}"
+            ) from err
+        except GimdowUnavailableError:
+            tracer.finish(trace, TRACE_OUTCOME_FAILED)
+            raise
+        self.coordinator.metrics.record(
+            METRICS_ENDPOINT_COMMAND, time.monotonic() - start, not success, self._device.id
+        )
+        if not success:
+            tracer.finish(trace, TRACE_OUTCOME_FAILED)
+            raise HomeAssistantError(
+                f"Failed to {'lock' if state else 'unlock'} {self._device.name}"
+            )
+        # The trace ends once the lock reports the new state
+        tracer.finish(trace, TRACE_OUTCOME_SENT)
+        self.coordinator.async_set_lock_state(self._device.id, state)
 
-            tid = ticket_response["result"].get("ticket_id")
-            if tid:
-                # Step 2: Use the ticket to perform the lock/unlock operation
-                operate_response = self._device_manager.customer_api.post(
-                    f"/v1.0/smart-lock/devices/{self._device.id}/password-free/door-operate",
-                    {"ticket_id": tid, "open": not state},
+    @callback
+    def _async_commands_done(self) -> None:
+        """Clear the command target once the queue is idle."""
+        self._queued_at = None
+        self.coordinator.async_set_command_target(self._device.id, None)
+
+    async def _async_send_command(
+        self, state: bool, trace: CommandTrace | None = None
+    ) -> bool:
+        """Send the lock/unlock command to the device."""
+        if trace is None:
+            # Untraced command, the spans are dropped
+            trace = CommandTrace(
+                "", self._device.id, "lock" if state else "unlock", time.monotonic()
+            )
+        try:
+            # Use the pre-fetched password ticket, or request one now
+            if (ticket := self._tickets.take(self._device.id)) is not None:
+                operate_response = await self._async_door_operate(
+                    ticket.ticket_id, state, trace
                 )
                 if operate_response.get("success"):
-                    self._attr_is_locked = state
-                    self.schedule_update_ha_state()
-        except Exception as error:
+                    return True
+                # The cached ticket was rejected, retry once with a fresh one
+                LOGGER.debug(
+                    "Cached ticket rejected for %s: %s",
+                    self._device.id,
+                    operate_response.get("msg"),
+                )
+
+            ticket = await self._tickets.async_fetch(self._device.id, trace)
+            if ticket:
+                operate_response = await self._async_door_operate(
+                    ticket.ticket_id, state, trace
+                )
+                return bool(operate_response.get("success"))
+        except (GimdowAuthError, GimdowUnavailableError):
+            raise
+        except GimdowApiError as error:
             LOGGER.error("Failed to send lock command: %s", error)
+        finally:
+            # Have a ticket ready for the next command
+            self.hass.async_create_background_task(
+                self._tickets.async_prefetch(self._device.id),
+                f"{DOMAIN} ticket prefetch {self._device.id}",
+            )
+        return False
+
+    async def _async_door_operate(
+        self, ticket_id: str, state: bool, trace: CommandTrace | None = None
+    ) -> dict[str, Any]:
+        """Perform the lock/unlock operation with a password ticket."""
+        return await self.coordinator.gateway.async_post(
+            API_ENDPOINT_DOOR_OPERATE,
+            f"/v1.0/smart-lock/devices/{self._device.id}/password-free/door-operate",
+            {"ticket_id": ticket_id, "open": not state},
+            self._device.id,
+            trace,
+            # A retried command could move the bolt long after the tap
+            idempotent=False,
+        )
 
     async def async_added_to_hass(self) -> None:
         """Call when entity is added to hass."""
-        self.async_on_remove(
-            async_dispatcher_connect(
-                self.hass,
-                f"{GIMDOW_HA_SIGNAL_UPDATE_ENTITY}_{self._device.id}",
-                self.async_write_ha_state,
-            )
+        await super().async_added_to_hass()
+        self._commands = GimdowCommandQueue(
+            self.hass,
+            self._device.id,
+            self._async_execute_command,
+            self._async_commands_done,
         )
-
-    @callback
-    def update_device(self) -> None:
-        """Update the lock status using device logs."""
-        self._fetch_device_logs()
-
-    def _fetch_device_logs(self) -> None:
-        """Fetch the lock's device logs to determine the latest state."""
-        try:
-            now = datetime.utcnow()
-            end_time = int(now.timestamp() * 1000)
-            start_time = int((now - timedelta(days=7)).timestamp() * 1000)
-
-            response = self._device_manager.customer_api.get(
-                f"/v1.0/devices/{self._device.id}/logs?end_time={end_time}&start_time={start_time}&type=7"
-            )
-
-            if response.get("success"):
-                log_entries = response["result"]["logs"]
-                self._update_lock_state_from_logs(log_entries)
-            else:
-                LOGGER.error("Failed to fetch logs for device: %s", self._device.id)
-        except Exception as error:
-            LOGGER.error("Error fetching device logs: %s", error)
-
-    def _update_lock_state_from_logs(self, logs: list[dict[str, Any]]) -> None:
-        """Update lock state based on logs fetched from the API."""
-        if not logs:
-            LOGGER.warning("No logs found for device: %s", self._device.id)
-            return
-
-        latest_entry = None
-
-        for log in logs:
-            event_type = log.get("type", "")
-            if event_type in LOCK_LOG_PRIORITY:
-                if not latest_entry or LOCK_LOG_PRIORITY[event_type] > LOCK_LOG_PRIORITY[latest_entry["type"]]:
-                    latest_entry = log
-
-        if latest_entry:
-            # Determine the lock state based on the latest log entry
-            self._attr_is_locked = latest_entry["type"] in {"lock_record", "manual_lock"}
-            self._lock_state_last_timestamp = latest_entry.get("time", "")
-            LOGGER.info("Updated lock state for %s based on logs: %s", self._device.id, latest_entry)
-            self.schedule_update_ha_state()
+        self.async_on_remove(self._commands.async_cancel)
@@ -0,0 +1,161 @@
+"""Local access event history of Gimdow locks."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    GIMDOW_HA_SIGNAL_LOCK_EVENT,
+    HISTORY_DEDUPE_WINDOW,
+    HISTORY_MAX_EVENTS,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .logs import LOCK_EVENTS, log_event_time, log_event_type
+
+# Log event types and DP codes kept in the history
+EVENT_TYPES = frozenset(LOCK_EVENTS)
+
+EVENT_SOURCE_LOG = "log"
+EVENT_SOURCE_MQ = "mq"
+
+
+@dataclass(slots=True)
+class LockEvent:
+    """A single access event of a lock."""
+
+    time: int  # milliseconds
+    event: str
+    value: Any
+    source: str
+
+    @classmethod
+    def from_log(cls, log: dict[str, Any]) -> LockEvent:
+        """Return the event of a device log entry."""
+        return cls(
+            log_event_time(log), log_event_type(log), log.get("value"), EVENT_SOURCE_LOG
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the event as a dictionary."""
+        return {
+            "time": dt_util.utc_from_timestamp(self.time / 1000).isoformat(),
+            "event": self.event,
+            "value": self.value,
+            "source": self.source,
+        }
+
+
+_event_time = attrgetter("time")
+
+
+class GimdowEventHistory:
+    """Keep the newest access events of every lock, in memory and on disk.
+
+    Each lock has a ring buffer of HISTORY_MAX_EVENTS events ordered by time.
+    Events are stored as plain lists to keep the storage file small.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the event history."""
+        self._hass = hass
+        self._store: Store[dict[str, list[list[Any]]]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.history"
+        )
+        self._events: dict[str, deque[LockEvent]] = {}
+
+    async def async_load(self) -> None:
+        """Load the stored events."""
+        if (data := await self._store.async_load()) is None:
+            return
+        self._events = {
+            device_id: deque(
+                (LockEvent(*row) for row in rows), maxlen=HISTORY_MAX_EVENTS
+            )
+            for device_id, rows in data.items()
+        }
+
+    def get(
+        self, device_id: str, since: int | None = None, limit: int | None = None
+    ) -> list[LockEvent]:
+        """Return the events of a lock, newest first."""
+        events: list[LockEvent] = []
+        for event in reversed(self._events.get(device_id, ())):
+            if since is not None and event.time < since:
+                break
+            if limit is not None and len(events) >= limit:
+                break
+            events.append(event)
+        return events
+
+    @callback
+    def async_add(self, device_id: str, events: Iterable[LockEvent]) -> None:
+        """Add events of a lock, notify the event entities and schedule a save."""
+        if (buffer := self._events.get(device_id)) is None:
+            buffer = self._events[device_id] = deque(maxlen=HISTORY_MAX_EVENTS)
+
+        added = False
+        for event in sorted(events, key=_event_time):
+            if self._is_duplicate(buffer, event):
+                continue
+            if not buffer or event.time >= buffer[-1].time:
+                buffer.append(event)
+            else:
+                # Logged events can be older than events pushed since
+                index = bisect_right(buffer, event.time, key=_event_time)
+                if len(buffer) == buffer.maxlen:
+                    if index == 0:
+                        continue
+                    buffer.popleft()
+                    index -= 1
+                buffer.insert(index, event)
+            added = True
+            async_dispatcher_send(
+                self._hass, f"{GIMDOW_HA_SIGNAL_LOCK_EVENT}_{device_id}", event
+            )
+
+        if added:
+            self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    @callback
+    def async_remove_device(self, device_id: str) -> None:
+        """Forget the events of a device that left the account."""
+        if self._events.pop(device_id, None) is not None:
+            self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Remove the stored events."""
+        await self._store.async_remove()
+
+    @staticmethod
+    def _is_duplicate(buffer: deque[LockEvent], event: LockEvent) -> bool:
+        """Return if the event was already added from the other source."""
+        for known in reversed(buffer):
+            if known.time > event.time + HISTORY_DEDUPE_WINDOW:
+                continue
+            if known.time < event.time - HISTORY_DEDUPE_WINDOW:
+                return False
+            if known.event == event.event and known.source != event.source:
+                return True
+        return False
+
+    @callback
+    def _data_to_save(self) -> dict[str, list[list[Any]]]:
+        """Return the data to store."""
+        return {
+            device_id: [
+                [event.time, event.event, event.value, event.source] for event in buffer
+            ]
+            for device_id, buffer in self._events.items()
+        }
@@ -0,0 +1,130 @@
+"""Device log reading for Gimdow locks."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from typing import Any
+
+from .api import GimdowApiError, GimdowApiGateway
+from .const import API_ENDPOINT_LOGS, LOG_PAGE_SIZE
+
+# Log event type -> (is_locked, priority). The newest event decides the lock
+# state; the priority only breaks ties between events with the same time.
+LOCK_EVENTS: dict[str, tuple[bool, int]] = {
+    # Locking
+    "lock_record": (True, 5),
+    "manual_lock": (True, 3),
+    "automatic_lock": (True, 3),
+    "auto_lock": (True, 3),
+    # Unlocking at the lock
+    "unlock_key": (False, 4),
+    "open_inside": (False, 3),
+    "unlock_fingerprint": (False, 2),
+    "unlock_finger_vein": (False, 2),
+    "unlock_password": (False, 2),
+    "unlock_temporary": (False, 2),
+    "unlock_dynamic": (False, 2),
+    "unlock_offline_pd": (False, 2),
+    "unlock_card": (False, 2),
+    "unlock_face": (False, 2),
+    "unlock_hand": (False, 2),
+    "unlock_eye": (False, 2),
+    "unlock_double": (False, 2),
+    "unlock_special": (False, 2),
+    "unlock_ble": (False, 2),
+    # Remote unlocking
+    "unlock_app": (False, 1),
+    "unlock_phone_remote": (False, 1),
+    "unlock_voice_remote": (False, 1),
+    "unlock_remote": (False, 1),
+    "remote_no_dp_key": (False, 1),
+}
+
+# DP codes whose value is the lock state itself
+LOCK_STATE_EVENTS = {"lock_motor_state"}
+
+_TRUE_VALUES = {True, 1, "1", "true", "True"}
+
+
+def log_event_type(log: dict[str, Any]) -> str:
+    """Return the event type of a log entry."""
+    return log.get("type") or log.get("code") or ""
+
+
+def log_event_time(log: dict[str, Any]) -> int:
+    """Return the time of a log entry in milliseconds."""
+    return int(log.get("time") or log.get("event_time") or 0)
+
+
+def log_decision(log: dict[str, Any]) -> tuple[bool, int] | None:
+    """Return the lock state and priority decided by a log entry, if any."""
+    event_type = log_event_type(log)
+    if (decision := LOCK_EVENTS.get(event_type)) is not None:
+        return decision
+    if event_type in LOCK_STATE_EVENTS:
+        return log.get("value") in _TRUE_VALUES, 0
+    return None
+
+
+async def async_iter_log_pages(
+    gateway: GimdowApiGateway, device_id: str, start_time: int, end_time: int
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Yield the log entries of a lock one page at a time, newest first."""
+    params: dict[str, Any] = {
+        "start_time": start_time,
+        "end_time": end_time,
+        "type": 7,
+        "size": LOG_PAGE_SIZE,
+    }
+    while True:
+        response = await gateway.async_get(
+            API_ENDPOINT_LOGS, f"/v1.0/devices/{device_id}/logs", params, device_id
+        )
+        if not response.get("success"):
+            raise GimdowApiError(f"Failed to fetch logs for device: {device_id}")
+
+        result = response.get("result") or {}
+        yield result.get("logs") or []
+
+        if not result.get("has_next") or not (row_key := result.get("next_row_key")):
+            return
+        params["start_row_key"] = row_key
+
+
+class LockLogReducer:
+    """Reduce pages of log entries, newest first, to a lock state."""
+
+    def __init__(self, last_timestamp: int | None) -> None:
+        """Initialize the reducer."""
+        self.newest_timestamp = last_timestamp or 0
+        self.latest_entry: dict[str, Any] | None = None
+        self.is_locked: bool | None = None
+        self._decided_time = -1
+        self._decided_priority = -1
+        # Access entries of the fed pages, for the event history
+        self.events: list[dict[str, Any]] = []
+
+    def feed(self, logs: list[dict[str, Any]]) -> bool:
+        """Process a page and return if the lock state is decided.
+
+        Every entry of the page is read once: the access entries are kept for
+        the history, and the newest decisive entry decides without relying on
+        the page being ordered.
+        """
+        for log in logs:
+            event_time = log_event_time(log)
+            if event_time > self.newest_timestamp:
+                self.newest_timestamp = event_time
+
+            if (decision := log_decision(log)) is None:
+                continue
+            if log_event_type(log) in LOCK_EVENTS:
+                self.events.append(log)
+            if (event_time, decision[1]) > (self._decided_time, self._decided_priority):
+                self.is_locked = decision[0]
+                self.latest_entry = log
+                self._decided_time = event_time
+                self._decided_priority = decision[1]
+
+        # Older pages cannot change a decision made on a newer page
+        return self.latest_entry is not None
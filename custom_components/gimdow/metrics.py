@@ -0,0 +1,135 @@
+"""Request metrics for the Gimdow Lock integration."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+import time
+from typing import Any
+
+from .const import METRICS_LATENCY_BUCKETS, METRICS_MQ_RATE_WINDOW
+
+
+class EndpointStats:
+    """Request count, error count and latency histogram of one endpoint."""
+
+    __slots__ = ("buckets", "errors", "requests", "total_time")
+
+    def __init__(self) -> None:
+        """Initialize the stats."""
+        self.requests = 0
+        self.errors = 0
+        self.total_time = 0.0
+        # One bucket per upper bound, plus one for slower requests
+        self.buckets = [0] * (len(METRICS_LATENCY_BUCKETS) + 1)
+
+    def record(self, duration: float, error: bool) -> None:
+        """Record a single request."""
+        self.requests += 1
+        self.errors += error
+        self.total_time += duration
+        self.buckets[bisect_left(METRICS_LATENCY_BUCKETS, duration)] += 1
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the upper bound of the bucket holding the given percentile."""
+        if not self.requests:
+            return None
+        rank = self.requests * percent / 100
+        count = 0
+        for bound, bucket in zip(METRICS_LATENCY_BUCKETS, self.buckets):
+            count += bucket
+            if count >= rank:
+                return bound
+        # Slower than the largest bound
+        return METRICS_LATENCY_BUCKETS[-1]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stats as a dictionary."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "average": self.total_time / self.requests if self.requests else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "histogram": dict(
+                zip([*map(str, METRICS_LATENCY_BUCKETS), "slower"], self.buckets)
+            ),
+        }
+
+
+class GimdowMetrics:
+    """Collect the request metrics of a config entry."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.endpoints: dict[str, EndpointStats] = {}
+        self.devices: dict[str, dict[str, EndpointStats]] = {}
+        self._mq_messages: deque[float] = deque(maxlen=10_000)
+
+    def record(
+        self,
+        endpoint: str,
+        duration: float,
+        error: bool = False,
+        device_id: str | None = None,
+    ) -> None:
+        """Record a request to an endpoint."""
+        if (stats := self.endpoints.get(endpoint)) is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        stats.record(duration, error)
+        if device_id is None:
+            return
+        device_stats = self.devices.setdefault(device_id, {})
+        if (stats := device_stats.get(endpoint)) is None:
+            stats = device_stats[endpoint] = EndpointStats()
+        stats.record(duration, error)
+
+    @contextmanager
+    def measure(self, endpoint: str, device_id: str | None = None) -> Iterator[None]:
+        """Measure the duration of a request, counting raised errors."""
+        start = time.monotonic()
+        try:
+            yield
+        except Exception:
+            self.record(endpoint, time.monotonic() - start, True, device_id)
+            raise
+        self.record(endpoint, time.monotonic() - start, False, device_id)
+
+    def get(self, endpoint: str, device_id: str | None = None) -> EndpointStats | None:
+        """Return the stats of an endpoint, optionally for a single device."""
+        if device_id is None:
+            return self.endpoints.get(endpoint)
+        return self.devices.get(device_id, {}).get(endpoint)
+
+    def record_mq_message(self) -> None:
+        """Record a message received over MQ, safe to call from any thread."""
+        self._mq_messages.append(time.monotonic())
+
+    @property
+    def mq_message_rate(self) -> float:
+        """Return the number of MQ messages per minute over the recent window."""
+        since = time.monotonic() - METRICS_MQ_RATE_WINDOW
+        recent = 0
+        # Copy first, the MQ thread may append while iterating
+        for received in reversed(list(self._mq_messages)):
+            if received < since:
+                break
+            recent += 1
+        return recent * 60 / METRICS_MQ_RATE_WINDOW
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a dictionary."""
+        return {
+            "endpoints": {
+                endpoint: stats.as_dict() for endpoint, stats in self.endpoints.items()
+            },
+            "devices": {
+                device_id: {
+                    endpoint: stats.as_dict() for endpoint, stats in endpoints.items()
+                }
+                for device_id, endpoints in self.devices.items()
+            },
+            "mq_message_rate": self.mq_message_rate,
+        }
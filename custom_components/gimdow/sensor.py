@@ -0,0 +1,203 @@
+"""Support for Gimdow Lock sensors."""
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from . import TuyaConfigEntry
+from .const import (
+    DPCODE_BATTERY_STATE,
+    DPCODE_RESIDUAL_ELECTRICITY,
+    GIMDOW_HA_SIGNAL_LOCK_EVENT,
+    METRICS_ENDPOINT_COMMAND,
+)
+from .coordinator import GimdowCoordinator
+from .entity import GimdowEntity, async_setup_device_entities
+from .history import LockEvent
+from .logs import LOCK_EVENTS
+from .metrics import GimdowMetrics
+
+if TYPE_CHECKING:
+    from tuya_sharing import CustomerDevice
+
+# Only the account-wide MQ rate sensor polls, and it does not call the cloud
+SCAN_INTERVAL = timedelta(seconds=60)
+
+# Values of the battery_state data point
+BATTERY_STATES = ["high", "middle", "low", "poweroff"]
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: TuyaConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up Gimdow Lock sensors based on a config entry."""
+    hass_data = entry.runtime_data
+
+    def async_create_entities(device: CustomerDevice) -> list[SensorEntity]:
+        """Create the sensors of a lock, for the data points it reports."""
+        coordinator = hass_data.coordinator
+        entities: list[SensorEntity] = [
+            GimdowCommandLatencySensor(device, coordinator, 50),
+            GimdowCommandLatencySensor(device, coordinator, 95),
+        ]
+        if any(code in LOCK_EVENTS for code in device.status):
+            # The lock pushes its access events, which fill the history
+            entities.append(GimdowLastOperatorSensor(device, coordinator))
+        if DPCODE_RESIDUAL_ELECTRICITY in device.status:
+            entities.append(GimdowBatterySensor(device, coordinator))
+        if DPCODE_BATTERY_STATE in device.status:
+            entities.append(GimdowBatteryStateSensor(device, coordinator))
+        return entities
+
+    async_setup_device_entities(hass, entry, async_add_entities, async_create_entities)
+    async_add_entities([GimdowMqMessageRateSensor(entry, hass_data.metrics)])
+
+
+class GimdowBatterySensor(GimdowEntity, SensorEntity):
+    """Battery level of a lock, read from the shared lock state."""
+
+    _attr_device_class = SensorDeviceClass.BATTERY
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_name = "Battery"
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, device: CustomerDevice, coordinator: GimdowCoordinator) -> None:
+        """Initialize the sensor."""
+        super().__init__(device, coordinator)
+        self._attr_unique_id = f"gimdow.{device.id}.battery"
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the battery level."""
+        return self._lock_state.battery_level
+
+
+class GimdowBatteryStateSensor(GimdowEntity, SensorEntity):
+    """Coarse battery state reported by a lock."""
+
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_name = "Battery state"
+    _attr_options = BATTERY_STATES
+
+    def __init__(self, device: CustomerDevice, coordinator: GimdowCoordinator) -> None:
+        """Initialize the sensor."""
+        super().__init__(device, coordinator)
+        self._attr_unique_id = f"gimdow.{device.id}.battery_state"
+
+    @property
+    def native_value(self) -> str | None:
+        """Return the battery state."""
+        battery_state = self._lock_state.battery_state
+        return battery_state if battery_state in BATTERY_STATES else None
+
+
+class GimdowLastOperatorSensor(GimdowEntity, SensorEntity):
+    """Who last operated a lock, read from the local event history."""
+
+    _attr_name = "Last operator"
+
+    def __init__(self, device: CustomerDevice, coordinator: GimdowCoordinator) -> None:
+        """Initialize the sensor."""
+        super().__init__(device, coordinator)
+        self._attr_unique_id = f"gimdow.{device.id}.last_operator"
+        self._event = next(
+            (
+                event
+                for event in coordinator.history.get(device.id)
+                if event.event in LOCK_EVENTS
+            ),
+            None,
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Call when entity is added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                f"{GIMDOW_HA_SIGNAL_LOCK_EVENT}_{self._device_id}",
+                self._async_handle_event,
+            )
+        )
+
+    @callback
+    def _async_handle_event(self, event: LockEvent) -> None:
+        """Keep the newest lock or unlock event."""
+        if event.event not in LOCK_EVENTS or (
+            self._event is not None and event.time < self._event.time
+        ):
+            return
+        self._event = event
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> str | None:
+        """Return the user or credential that operated the lock."""
+        if self._event is None or self._event.value is None:
+            return None
+        return str(self._event.value)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return how and when the lock was operated."""
+        if self._event is None:
+            return None
+        event = self._event.as_dict()
+        return {"method": event["event"], "time": event["time"]}
+
+
+class GimdowCommandLatencySensor(GimdowEntity, SensorEntity):
+    """Percentile of the lock/unlock command latency of a lock."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self, device: CustomerDevice, coordinator: GimdowCoordinator, percentile: int
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(device, coordinator)
+        self._percentile = percentile
+        self._attr_unique_id = f"gimdow.{device.id}.command_latency_p{percentile}"
+        self._attr_name = f"Command latency p{percentile}"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the latency percentile."""
+        stats = self.coordinator.metrics.get(METRICS_ENDPOINT_COMMAND, self._device_id)
+        return stats.percentile(self._percentile) if stats else None
+
+
+class GimdowMqMessageRateSensor(SensorEntity):
+    """Rate of the real-time messages received for an account."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_native_unit_of_measurement = "messages/min"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, entry: TuyaConfigEntry, metrics: GimdowMetrics) -> None:
+        """Initialize the sensor."""
+        self._metrics = metrics
+        self._attr_unique_id = f"gimdow.{entry.entry_id}.mq_message_rate"
+        self._attr_name = f"{entry.title} MQ message rate"
+
+    @property
+    def native_value(self) -> float:
+        """Return the message rate."""
+        return round(self._metrics.mq_message_rate, 2)
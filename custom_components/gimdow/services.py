@@ -0,0 +1,86 @@
+"""Services for the Gimdow Lock integration."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.util import dt as dt_util
+
+from .const import ATTR_LIMIT, ATTR_SINCE, DOMAIN, SERVICE_GET_EVENT_HISTORY
+
+if TYPE_CHECKING:
+    from . import TuyaConfigEntry
+
+GET_EVENT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Optional(ATTR_SINCE): cv.datetime,
+        vol.Optional(ATTR_LIMIT): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def async_get_event_history(call: ServiceCall) -> ServiceResponse:
+        """Return the locally stored access events of a lock."""
+        device_entry = dr.async_get(hass).async_get(call.data[ATTR_DEVICE_ID])
+        if device_entry is None:
+            raise ServiceValidationError(
+                f"Unknown device: {call.data[ATTR_DEVICE_ID]}"
+            )
+        device_id = next(
+            (
+                identifier
+                for domain, identifier in device_entry.identifiers
+                if domain == DOMAIN
+            ),
+            None,
+        )
+
+        for entry_id in device_entry.config_entries:
+            entry: TuyaConfigEntry | None = hass.config_entries.async_get_entry(
+                entry_id
+            )
+            if (
+                device_id is None
+                or entry is None
+                or entry.domain != DOMAIN
+                or entry.state is not ConfigEntryState.LOADED
+            ):
+                continue
+            since: datetime | None = call.data.get(ATTR_SINCE)
+            events = entry.runtime_data.history.get(
+                device_id,
+                int(dt_util.as_utc(since).timestamp() * 1000) if since else None,
+                call.data.get(ATTR_LIMIT),
+            )
+            return {"events": [event.as_dict() for event in events]}
+
+        raise ServiceValidationError(
+            f"Device {call.data[ATTR_DEVICE_ID]} is not a loaded Gimdow lock"
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_EVENT_HISTORY,
+        async_get_event_history,
+        schema=GET_EVENT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
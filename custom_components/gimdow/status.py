@@ -0,0 +1,34 @@
+"""Device status reading for Gimdow locks."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Sequence
+from typing import Any
+
+from .api import GimdowApiError, GimdowApiGateway
+from .const import API_ENDPOINT_DEVICE_DETAIL, DEVICE_DETAIL_BATCH_SIZE
+
+
+def device_detail_status(detail: dict[str, Any]) -> dict[str, Any]:
+    """Return the status data points of a device detail as a dictionary."""
+    return {
+        item["code"]: item["value"]
+        for item in detail.get("status") or ()
+        if "code" in item and "value" in item
+    }
+
+
+async def async_iter_device_details(
+    gateway: GimdowApiGateway, device_ids: Sequence[str]
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Yield the details of the devices, one batch of devices per request."""
+    for start in range(0, len(device_ids), DEVICE_DETAIL_BATCH_SIZE):
+        batch = device_ids[start : start + DEVICE_DETAIL_BATCH_SIZE]
+        response = await gateway.async_get(
+            API_ENDPOINT_DEVICE_DETAIL,
+            "/v1.0/m/life/ha/devices/detail",
+            {"devIds": ",".join(batch)},
+        )
+        if not response.get("success"):
+            raise GimdowApiError(f"Failed to fetch the status of devices: {batch}")
+        yield response.get("result") or []
@@ -0,0 +1,86 @@
+"""Persistent storage for the Gimdow Lock integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, STORAGE_SAVE_DELAY, STORAGE_VERSION
+
+
+class GimdowLogCursorStore:
+    """Keep track of the newest processed log entry for each lock."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the log cursor store."""
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.log_cursors"
+        )
+        self._cursors: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        """Load the stored cursors."""
+        if (data := await self._store.async_load()) is not None:
+            self._cursors = data
+
+    def get_timestamp(self, device_id: str) -> int | None:
+        """Return the timestamp of the newest processed log entry."""
+        if (cursor := self._cursors.get(device_id)) is None:
+            return None
+        return cursor["timestamp"]
+
+    def get_is_locked(self, device_id: str) -> bool | None:
+        """Return the lock state decided by the processed log entries."""
+        if (cursor := self._cursors.get(device_id)) is None:
+            return None
+        return cursor["is_locked"]
+
+    @callback
+    def async_set(self, device_id: str, timestamp: int, is_locked: bool | None) -> None:
+        """Advance the cursor of a device and schedule a save."""
+        if (current := self.get_timestamp(device_id)) is not None and timestamp <= current:
+            return
+        if is_locked is None:
+            is_locked = self.get_is_locked(device_id)
+        self._cursors[device_id] = {"timestamp": timestamp, "is_locked": is_locked}
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Remove the stored cursors."""
+        await self._store.async_remove()
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        """Return the data to store."""
+        return dict(self._cursors)
+
+
+class GimdowDeviceSnapshotStore:
+    """Keep a compact snapshot of the account's devices for fast startup."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the device snapshot store."""
+        self._store: Store[list[dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.devices"
+        )
+        # Last loaded or scheduled snapshot, an unchanged one is not written again
+        self._data: list[dict[str, Any]] | None = None
+
+    async def async_load(self) -> list[dict[str, Any]]:
+        """Load the devices of the last snapshot."""
+        self._data = await self._store.async_load() or []
+        return self._data
+
+    @callback
+    def async_schedule_save(self, data: list[dict[str, Any]]) -> None:
+        """Schedule saving a new snapshot if it differs from the last one."""
+        if data == self._data:
+            return
+        self._data = data
+        self._store.async_delay_save(lambda: data, STORAGE_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Remove the stored snapshot."""
+        await self._store.async_remove()
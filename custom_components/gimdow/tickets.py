@@ -0,0 +1,138 @@
+"""Password ticket cache for Gimdow lock commands."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+import time
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .api import GimdowApiError, GimdowApiGateway
+from .const import (
+    API_ENDPOINT_PASSWORD_TICKET,
+    DOMAIN,
+    LOGGER,
+    TICKET_ACTIVE_WINDOW,
+    TICKET_DEFAULT_LIFETIME,
+    TICKET_REFRESH_MARGIN,
+)
+
+if TYPE_CHECKING:
+    from tuya_sharing import Manager
+
+    from .tracing import CommandTrace
+
+
+@dataclass(slots=True)
+class PasswordTicket:
+    """A single-use password ticket for a lock."""
+
+    ticket_id: str
+    expires_at: float
+
+    @property
+    def valid(self) -> bool:
+        """Return if the ticket can still be used."""
+        return self.expires_at - TICKET_REFRESH_MARGIN > time.monotonic()
+
+
+class PasswordTicketCache:
+    """Keep a password ticket ready for the next command of recently used locks.
+
+    After a command the ticket of the lock is refreshed before it expires,
+    until the lock has not been used for TICKET_ACTIVE_WINDOW.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, manager: Manager, gateway: GimdowApiGateway
+    ) -> None:
+        """Initialize the ticket cache."""
+        self._hass = hass
+        self._manager = manager
+        self._gateway = gateway
+        self._tickets: dict[str, PasswordTicket] = {}
+        # Monotonic time until which the ticket of a lock is kept fresh
+        self._active_until: dict[str, float] = {}
+        self._refresh_unsubs: dict[str, CALLBACK_TYPE] = {}
+
+    async def async_fetch(
+        self, device_id: str, trace: CommandTrace | None = None
+    ) -> PasswordTicket | None:
+        """Request a new password ticket from the cloud."""
+        response = await self._gateway.async_post(
+            API_ENDPOINT_PASSWORD_TICKET,
+            f"/v1.0/smart-lock/devices/{device_id}/password-ticket",
+            device_id=device_id,
+            trace=trace,
+        )
+        result = response.get("result") or {}
+        if not (ticket_id := result.get("ticket_id")):
+            LOGGER.error("Failed to get a password ticket for device: %s", device_id)
+            return None
+        lifetime = result.get("expire_time") or TICKET_DEFAULT_LIFETIME
+        return PasswordTicket(ticket_id, time.monotonic() + lifetime)
+
+    def take(self, device_id: str) -> PasswordTicket | None:
+        """Return the cached ticket of a lock if it is still valid."""
+        ticket = self._tickets.pop(device_id, None)
+        if ticket is not None and ticket.valid:
+            return ticket
+        return None
+
+    async def async_prefetch(self, device_id: str) -> None:
+        """Keep a ticket ready for the next commands of a lock that was used."""
+        self._active_until[device_id] = time.monotonic() + TICKET_ACTIVE_WINDOW
+        if device_id not in self._tickets:
+            await self._async_refresh(device_id)
+
+    async def _async_refresh(self, device_id: str) -> None:
+        """Fetch a ticket for a lock in use and refresh it before it expires."""
+        self._cancel_refresh(device_id)
+        self._tickets.pop(device_id, None)
+        device = self._manager.device_map.get(device_id)
+        if (
+            device is None
+            or not device.online
+            or self._active_until.get(device_id, 0) <= time.monotonic()
+        ):
+            self._active_until.pop(device_id, None)
+            return
+        try:
+            ticket = await self.async_fetch(device_id)
+        except GimdowApiError as error:
+            LOGGER.debug("Error prefetching password ticket for %s: %s", device_id, error)
+            return
+        if ticket is None:
+            return
+        self._tickets[device_id] = ticket
+
+        @callback
+        def _async_refresh(_now: datetime) -> None:
+            """Replace the ticket before it expires."""
+            self._refresh_unsubs.pop(device_id, None)
+            self._hass.async_create_background_task(
+                self._async_refresh(device_id), f"{DOMAIN} ticket refresh {device_id}"
+            )
+
+        self._refresh_unsubs[device_id] = async_call_later(
+            self._hass,
+            max(ticket.expires_at - time.monotonic() - TICKET_REFRESH_MARGIN, 0),
+            _async_refresh,
+        )
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel all scheduled ticket refreshes."""
+        for device_id in list(self._refresh_unsubs):
+            self._cancel_refresh(device_id)
+        self._tickets.clear()
+        self._active_until.clear()
+
+    @callback
+    def _cancel_refresh(self, device_id: str) -> None:
+        """Cancel the scheduled refresh of a lock's ticket."""
+        if (unsub := self._refresh_unsubs.pop(device_id, None)) is not None:
+            unsub()
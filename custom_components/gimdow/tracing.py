@@ -0,0 +1,136 @@
+"""Latency tracing of Gimdow lock commands."""
+
+from __future__ import annotations
+
+from collections import deque
+import itertools
+import time
+from typing import Any
+
+from .const import LOGGER, TRACE_BUFFER_SIZE
+
+TRACE_OUTCOME_CONFIRMED = "confirmed"
+TRACE_OUTCOME_FAILED = "failed"
+TRACE_OUTCOME_SENT = "sent"
+TRACE_OUTCOME_UNCONFIRMED = "unconfirmed"
+
+
+class CommandSpan:
+    """A timed stage of a command."""
+
+    __slots__ = ("end", "stage", "start")
+
+    def __init__(self, stage: str, start: float, end: float) -> None:
+        """Initialize the span."""
+        self.stage = stage
+        self.start = start
+        self.end = end
+
+
+class CommandTrace:
+    """Timed stages of a single command, from the service call on."""
+
+    __slots__ = ("action", "command_id", "device_id", "outcome", "queued_at", "spans")
+
+    def __init__(
+        self, command_id: str, device_id: str, action: str, queued_at: float
+    ) -> None:
+        """Initialize the trace."""
+        self.command_id = command_id
+        self.device_id = device_id
+        self.action = action
+        self.queued_at = queued_at
+        self.outcome: str | None = None
+        self.spans: list[CommandSpan] = []
+
+    @property
+    def ended_at(self) -> float:
+        """Return the end of the last stage."""
+        return self.spans[-1].end if self.spans else self.queued_at
+
+    @property
+    def duration(self) -> float:
+        """Return the time from the service call to the end of the last stage."""
+        return self.ended_at - self.queued_at
+
+    def add_span(self, stage: str, start: float, end: float) -> None:
+        """Record a stage that already ended."""
+        self.spans.append(CommandSpan(stage, start, end))
+
+    def breakdown(self) -> str:
+        """Return the stage durations as text."""
+        return ", ".join(
+            f"{span.stage}={span.end - span.start:.3f}s" for span in self.spans
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the trace as a dictionary, times relative to the service call."""
+        return {
+            "command_id": self.command_id,
+            "device_id": self.device_id,
+            "action": self.action,
+            "outcome": self.outcome,
+            "duration": self.duration,
+            "spans": [
+                {
+                    "stage": span.stage,
+                    "start": span.start - self.queued_at,
+                    "duration": span.end - span.start,
+                }
+                for span in self.spans
+            ],
+        }
+
+
+class GimdowCommandTracer:
+    """Keep the traces of the latest commands of a config entry."""
+
+    def __init__(self) -> None:
+        """Initialize the tracer."""
+        self.slow_threshold: float | None = None
+        self._traces: deque[CommandTrace] = deque(maxlen=TRACE_BUFFER_SIZE)
+        # Sent commands waiting for the lock to report the new state
+        self._unconfirmed: dict[str, CommandTrace] = {}
+        self._ids = itertools.count(1)
+
+    def start(self, device_id: str, action: str, queued_at: float) -> CommandTrace:
+        """Start the trace of a command queued at the given monotonic time."""
+        trace = CommandTrace(f"{next(self._ids):06d}", device_id, action, queued_at)
+        self._traces.append(trace)
+        return trace
+
+    def finish(self, trace: CommandTrace, outcome: str) -> None:
+        """Finish the cloud part of a command."""
+        trace.outcome = outcome
+        if (previous := self._unconfirmed.pop(trace.device_id, None)) is not None:
+            previous.outcome = TRACE_OUTCOME_UNCONFIRMED
+        if outcome == TRACE_OUTCOME_SENT:
+            self._unconfirmed[trace.device_id] = trace
+        else:
+            self._log_if_slow(trace)
+
+    def confirm(self, device_id: str, source: str) -> None:
+        """Record that the lock reported the state of its last command."""
+        if (trace := self._unconfirmed.pop(device_id, None)) is None:
+            return
+        trace.add_span(f"confirm_{source}", trace.ended_at, time.monotonic())
+        trace.outcome = TRACE_OUTCOME_CONFIRMED
+        self._log_if_slow(trace)
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return the buffered traces, oldest first."""
+        return [trace.as_dict() for trace in self._traces]
+
+    def _log_if_slow(self, trace: CommandTrace) -> None:
+        """Log the stages of a command slower than the threshold."""
+        if not self.slow_threshold or trace.duration < self.slow_threshold:
+            return
+        LOGGER.warning(
+            "Slow %s command %s for %s took %.3fs (%s): %s",
+            trace.action,
+            trace.command_id,
+            trace.device_id,
+            trace.duration,
+            trace.outcome,
+            trace.breakdown(),
+        )
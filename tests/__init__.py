@@ -0,0 +1 @@
+"""Tests for the Gimdow Lock integration."""
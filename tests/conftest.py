@@ -0,0 +1,16 @@
+"""Fixtures for the Gimdow Lock tests.
+
+Run from the repository root with::
+
+    pip install -r benchmarks/requirements.txt
+    python -m pytest tests
+"""
+
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Enable the custom integration in every test."""
@@ -0,0 +1,196 @@
+"""Tests for the cloud request gateway and its circuit breakers."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.gimdow.api import (
+    CircuitBreaker,
+    GimdowApiError,
+    GimdowApiGateway,
+    GimdowAuthError,
+    GimdowUnavailableError,
+    sdk_error_reply,
+)
+from custom_components.gimdow.const import (
+    API_ENDPOINT_DOOR_OPERATE,
+    API_ENDPOINT_LOGS,
+    API_MAX_ATTEMPTS,
+    CIRCUIT_BREAKER_THRESHOLD,
+)
+from custom_components.gimdow.metrics import GimdowMetrics
+
+
+class ScriptedCustomerApi:
+    """Customer API answering like the SDK, from a list of outcomes."""
+
+    def __init__(self, *outcomes: dict[str, Any] | Exception) -> None:
+        """Initialize the API."""
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Answer a GET request with the next outcome, the last one repeats."""
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def post(
+        self,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Answer a POST request with the next outcome."""
+        return self.get(path, params)
+
+
+class ScriptedManager:
+    """Manager holding a scripted customer API."""
+
+    def __init__(self, customer_api: ScriptedCustomerApi) -> None:
+        """Initialize the manager."""
+        self.customer_api = customer_api
+
+
+def sdk_error(code: int, msg: str) -> Exception:
+    """Return the exception the SDK raises for an error reply."""
+    return Exception(f"network error:({code}) {msg}")
+
+
+@pytest.fixture(autouse=True)
+def no_backoff() -> Iterator[None]:
+    """Retry right away."""
+    with patch("custom_components.gimdow.api.API_BACKOFF_BASE", 0):
+        yield
+
+
+@pytest.fixture
+async def make_gateway(
+    hass: HomeAssistant,
+) -> AsyncIterator[Any]:
+    """Return a factory of gateways talking to a scripted API."""
+    gateways: list[GimdowApiGateway] = []
+
+    def factory(api: ScriptedCustomerApi) -> GimdowApiGateway:
+        gateway = GimdowApiGateway(
+            hass, ScriptedManager(api), f"account{len(gateways)}", GimdowMetrics()
+        )
+        gateways.append(gateway)
+        return gateway
+
+    yield factory
+    for gateway in gateways:
+        gateway.async_shutdown()
+
+
+def test_sdk_error_reply() -> None:
+    """Error replies are parsed from the SDK's exceptions, others are not."""
+    assert sdk_error_reply(sdk_error(1010, "token invalid")) == {
+        "success": False,
+        "code": 1010,
+        "msg": "token invalid",
+    }
+    assert sdk_error_reply(ConnectionError("reset by peer")) is None
+
+
+def test_circuit_breaker() -> None:
+    """The breaker opens at the threshold and closes on a success."""
+    breaker = CircuitBreaker(2, 60)
+    assert not breaker.record_failure()
+    assert not breaker.is_open
+    assert breaker.record_failure()
+    assert breaker.is_open
+    # Only the failure that opened the breaker reports it
+    assert not breaker.record_failure()
+    breaker.record_success()
+    assert not breaker.is_open
+
+
+def test_circuit_breaker_lets_a_probe_through() -> None:
+    """After the reset timeout a request may be sent again."""
+    breaker = CircuitBreaker(1, 0)
+    assert breaker.record_failure()
+    assert not breaker.is_open
+    assert breaker.opened_at is not None
+
+
+async def test_token_invalid_raises_auth_error(make_gateway: Any) -> None:
+    """A rejected token is not retried and starts a reauth."""
+    api = ScriptedCustomerApi(sdk_error(1010, "token invalid"))
+    gateway = make_gateway(api)
+    with pytest.raises(GimdowAuthError):
+        await gateway.async_get(API_ENDPOINT_LOGS, "/logs")
+    assert api.calls == 1
+
+
+async def test_business_error_is_returned(make_gateway: Any) -> None:
+    """Error replies are returned without retries or account failures."""
+    api = ScriptedCustomerApi(sdk_error(1106, "permission deny"))
+    gateway = make_gateway(api)
+    for _ in range(CIRCUIT_BREAKER_THRESHOLD + 1):
+        response = await gateway.async_get(API_ENDPOINT_LOGS, "/logs")
+        assert response == {"success": False, "code": 1106, "msg": "permission deny"}
+    assert api.calls == CIRCUIT_BREAKER_THRESHOLD + 1
+    assert gateway.is_available()
+
+
+async def test_offline_lock_only_opens_its_breaker(make_gateway: Any) -> None:
+    """An offline lock stops its own requests, not those of the account."""
+    api = ScriptedCustomerApi(sdk_error(2001, "device is offline"))
+    gateway = make_gateway(api)
+    response = await gateway.async_get(API_ENDPOINT_LOGS, "/logs", device_id="lock")
+    assert response["code"] == 2001
+    assert api.calls == 1
+    assert not gateway.is_available("lock")
+    with pytest.raises(GimdowUnavailableError):
+        await gateway.async_get(API_ENDPOINT_LOGS, "/logs", device_id="lock")
+    assert gateway.is_available("other")
+    assert gateway.is_available()
+
+
+async def test_transient_errors_are_retried(make_gateway: Any) -> None:
+    """A transient error reply is retried until the request succeeds."""
+    api = ScriptedCustomerApi(
+        sdk_error(500, "system error"), {"success": True, "result": []}
+    )
+    gateway = make_gateway(api)
+    response = await gateway.async_get(API_ENDPOINT_LOGS, "/logs")
+    assert response["success"]
+    assert api.calls == 2
+
+
+async def test_commands_are_not_retried(make_gateway: Any) -> None:
+    """A command that may have run is not sent a second time."""
+    api = ScriptedCustomerApi(
+        ConnectionError("read timed out"), {"success": True, "result": True}
+    )
+    gateway = make_gateway(api)
+    with pytest.raises(GimdowApiError):
+        await gateway.async_post(
+            API_ENDPOINT_DOOR_OPERATE, "/door-operate", idempotent=False
+        )
+    assert api.calls == 1
+
+
+async def test_transport_failures_open_the_account_breaker(
+    make_gateway: Any,
+) -> None:
+    """Requests that get no answer open the account breaker."""
+    api = ScriptedCustomerApi(ConnectionError("reset by peer"))
+    gateway = make_gateway(api)
+    for _ in range(CIRCUIT_BREAKER_THRESHOLD):
+        with pytest.raises(GimdowApiError):
+            await gateway.async_get(API_ENDPOINT_LOGS, "/logs")
+    assert api.calls == CIRCUIT_BREAKER_THRESHOLD * API_MAX_ATTEMPTS
+    assert not gateway.is_available()
+    with pytest.raises(GimdowUnavailableError):
+        await gateway.async_get(API_ENDPOINT_LOGS, "/logs")
@@ -0,0 +1,101 @@
+"""Tests for the per-device command queue."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.gimdow.commands import GimdowCommandQueue
+
+
+class FakeSender:
+    """Record the sent commands, holding each until it is released."""
+
+    def __init__(self, error: Exception | None = None) -> None:
+        """Initialize the sender."""
+        self.sent: list[bool] = []
+        self.idle = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self._error = error
+
+    async def send(self, state: bool) -> None:
+        """Send a command."""
+        self.sent.append(state)
+        self.started.set()
+        await self.release.wait()
+        if self._error is not None:
+            raise self._error
+
+    def on_idle(self) -> None:
+        """Count the idle notifications."""
+        self.idle += 1
+
+
+async def test_burst_collapses_to_latest(hass: HomeAssistant) -> None:
+    """Commands queued while one is sent collapse into the latest one."""
+    sender = FakeSender()
+    queue = GimdowCommandQueue(hass, "lock", sender.send, sender.on_idle)
+
+    first = asyncio.create_task(queue.async_submit(True))
+    await sender.started.wait()
+    queued = [
+        asyncio.create_task(queue.async_submit(state)) for state in (False, True, False)
+    ]
+    await asyncio.sleep(0)
+    sender.release.set()
+    await asyncio.gather(first, *queued)
+
+    assert sender.sent == [True, False]
+    assert sender.idle == 1
+    assert not queue.busy
+
+
+async def test_repeated_command_is_sent_once(hass: HomeAssistant) -> None:
+    """A queued command equal to the one just sent is not sent again."""
+    sender = FakeSender()
+    queue = GimdowCommandQueue(hass, "lock", sender.send, sender.on_idle)
+
+    first = asyncio.create_task(queue.async_submit(True))
+    await sender.started.wait()
+    second = asyncio.create_task(queue.async_submit(True))
+    await asyncio.sleep(0)
+    sender.release.set()
+    await asyncio.gather(first, second)
+
+    assert sender.sent == [True]
+
+
+async def test_failure_reaches_all_waiters(hass: HomeAssistant) -> None:
+    """Every caller waiting for a failed command gets its error."""
+    sender = FakeSender(ValueError("rejected"))
+    queue = GimdowCommandQueue(hass, "lock", sender.send, sender.on_idle)
+
+    first = asyncio.create_task(queue.async_submit(False))
+    await sender.started.wait()
+    sender.release.set()
+    with pytest.raises(ValueError):
+        await first
+    assert sender.idle == 1
+
+
+async def test_cancel_releases_the_command_being_sent(hass: HomeAssistant) -> None:
+    """Cancelling the queue while a command is sent releases all its callers."""
+    sender = FakeSender()
+    queue = GimdowCommandQueue(hass, "lock", sender.send, sender.on_idle)
+
+    first = asyncio.create_task(queue.async_submit(True))
+    await sender.started.wait()
+    queued = asyncio.create_task(queue.async_submit(False))
+    await asyncio.sleep(0)
+    queue.async_cancel()
+
+    for task in (first, queued):
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    assert sender.sent == [True]
+    assert sender.idle == 1
+    assert not queue.busy
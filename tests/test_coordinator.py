@@ -0,0 +1,149 @@
+"""Tests for the adaptive polling of the lock coordinator."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from tuya_sharing import CustomerDevice
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.gimdow.api import GimdowApiGateway
+from custom_components.gimdow.const import (
+    DEFAULT_SCAN_INTERVAL,
+    POLL_ACTIVE_INTERVAL,
+)
+from custom_components.gimdow.coordinator import GimdowCoordinator
+from custom_components.gimdow.history import GimdowEventHistory
+from custom_components.gimdow.metrics import GimdowMetrics
+from custom_components.gimdow.storage import (
+    GimdowDeviceSnapshotStore,
+    GimdowLogCursorStore,
+)
+
+
+class LockCloudApi:
+    """Customer API of an account with one lock that does not report its state."""
+
+    def __init__(self) -> None:
+        """Initialize the API."""
+        self.logs: list[dict[str, Any]] = [{"type": "lock_record", "time": 1_000}]
+        self.offline = False
+
+    def get(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Answer the device detail and log requests."""
+        if path.endswith("/logs"):
+            if self.offline:
+                raise Exception("network error:(2001) device is offline")
+            return {"success": True, "result": {"logs": self.logs, "has_next": False}}
+        return {
+            "success": True,
+            "result": [{"id": "lock", "online": True, "status": []}],
+        }
+
+
+class LockManager:
+    """Manager of the account, without MQ."""
+
+    def __init__(self, customer_api: LockCloudApi) -> None:
+        """Initialize the manager."""
+        self.customer_api = customer_api
+        self.mq = None
+        self.device_map = {
+            "lock": CustomerDevice(
+                id="lock",
+                name="Lock",
+                category="jtmspro",
+                product_id="product",
+                product_name="Lock",
+                online=True,
+                status={},
+            )
+        }
+
+
+@pytest.fixture(autouse=True)
+def no_backoff() -> Iterator[None]:
+    """Retry right away."""
+    with patch("custom_components.gimdow.api.API_BACKOFF_BASE", 0):
+        yield
+
+
+@pytest.fixture
+def api() -> LockCloudApi:
+    """Return the customer API of the account."""
+    return LockCloudApi()
+
+
+@pytest.fixture
+async def coordinator(
+    hass: HomeAssistant, api: LockCloudApi
+) -> AsyncIterator[GimdowCoordinator]:
+    """Return a coordinator polling the lock of the account."""
+    manager = LockManager(api)
+    metrics = GimdowMetrics()
+    gateway = GimdowApiGateway(hass, manager, "account", metrics)
+    yield GimdowCoordinator(
+        hass,
+        manager,
+        gateway,
+        GimdowLogCursorStore(hass, "entry"),
+        GimdowDeviceSnapshotStore(hass, "entry"),
+        GimdowEventHistory(hass, "entry"),
+        metrics,
+        {},
+    )
+    gateway.async_shutdown()
+
+
+def interval(coordinator: GimdowCoordinator) -> float:
+    """Return the seconds until the next coordinator refresh."""
+    assert coordinator.update_interval is not None
+    return coordinator.update_interval.total_seconds()
+
+
+async def test_active_lock_is_polled_quickly(
+    coordinator: GimdowCoordinator, api: LockCloudApi
+) -> None:
+    """A lock with new logs is polled quickly, then backs off while idle."""
+    await coordinator.async_refresh()
+    assert interval(coordinator) == pytest.approx(POLL_ACTIVE_INTERVAL, abs=1)
+
+    coordinator.get_state("lock").next_poll = None
+    await coordinator.async_refresh()
+    assert interval(coordinator) == pytest.approx(2 * POLL_ACTIVE_INTERVAL, abs=1)
+
+    api.logs = [{"type": "unlock_app", "time": 2_000}, *api.logs]
+    coordinator.get_state("lock").next_poll = None
+    await coordinator.async_refresh()
+    assert interval(coordinator) == pytest.approx(POLL_ACTIVE_INTERVAL, abs=1)
+    assert coordinator.get_state("lock").is_locked is False
+
+
+async def test_offline_lock_does_not_pin_the_interval(
+    coordinator: GimdowCoordinator,
+) -> None:
+    """An active lock that went offline is only checked at the scan interval."""
+    await coordinator.async_refresh()
+    assert interval(coordinator) == pytest.approx(POLL_ACTIVE_INTERVAL, abs=1)
+
+    coordinator.manager.device_map["lock"].online = False
+    await coordinator.async_refresh()
+    assert interval(coordinator) == DEFAULT_SCAN_INTERVAL
+
+
+async def test_unavailable_lock_does_not_pin_the_interval(
+    coordinator: GimdowCoordinator, api: LockCloudApi
+) -> None:
+    """A lock whose breaker opened is only checked at the scan interval."""
+    await coordinator.async_refresh()
+    assert interval(coordinator) == pytest.approx(POLL_ACTIVE_INTERVAL, abs=1)
+
+    api.offline = True
+    coordinator.get_state("lock").next_poll = None
+    await coordinator.async_refresh()
+    assert not coordinator.gateway.is_available("lock")
+    assert interval(coordinator) == DEFAULT_SCAN_INTERVAL
@@ -0,0 +1,79 @@
+"""Tests for the local access event history."""
+
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.gimdow.const import HISTORY_DEDUPE_WINDOW, HISTORY_MAX_EVENTS
+from custom_components.gimdow.history import (
+    EVENT_SOURCE_LOG,
+    EVENT_SOURCE_MQ,
+    GimdowEventHistory,
+    LockEvent,
+)
+
+
+async def test_pushed_and_logged_event_is_kept_once(hass: HomeAssistant) -> None:
+    """An event both pushed and logged within the window is only added once."""
+    history = GimdowEventHistory(hass, "entry")
+    history.async_add("lock", [LockEvent(10_000, "unlock_card", 1, EVENT_SOURCE_MQ)])
+    history.async_add("lock", [LockEvent(9_000, "unlock_card", 1, EVENT_SOURCE_LOG)])
+
+    assert [event.source for event in history.get("lock")] == [EVENT_SOURCE_MQ]
+
+
+async def test_repeated_events_of_one_source_are_kept(hass: HomeAssistant) -> None:
+    """Two events of the same source are two uses of the lock."""
+    history = GimdowEventHistory(hass, "entry")
+    history.async_add(
+        "lock",
+        [
+            LockEvent(10_000, "unlock_card", 1, EVENT_SOURCE_LOG),
+            LockEvent(11_000, "unlock_card", 1, EVENT_SOURCE_LOG),
+        ],
+    )
+
+    assert len(history.get("lock")) == 2
+
+
+async def test_events_outside_the_window_are_kept(hass: HomeAssistant) -> None:
+    """The same event type from both sources far apart is kept twice."""
+    history = GimdowEventHistory(hass, "entry")
+    history.async_add("lock", [LockEvent(10_000, "unlock_card", 1, EVENT_SOURCE_MQ)])
+    history.async_add(
+        "lock",
+        [
+            LockEvent(
+                10_000 + HISTORY_DEDUPE_WINDOW + 1, "unlock_card", 1, EVENT_SOURCE_LOG
+            ),
+            LockEvent(10_000, "lock_record", 1, EVENT_SOURCE_LOG),
+        ],
+    )
+
+    assert len(history.get("lock")) == 3
+
+
+async def test_older_logged_events_are_inserted_in_order(hass: HomeAssistant) -> None:
+    """Logged events older than pushed ones keep the history ordered."""
+    history = GimdowEventHistory(hass, "entry")
+    history.async_add("lock", [LockEvent(100_000, "unlock_card", 1, EVENT_SOURCE_MQ)])
+    history.async_add("lock", [LockEvent(50_000, "lock_record", 1, EVENT_SOURCE_LOG)])
+
+    assert [event.time for event in history.get("lock")] == [100_000, 50_000]
+    assert [event.time for event in history.get("lock", since=60_000)] == [100_000]
+
+
+async def test_buffer_keeps_the_newest_events(hass: HomeAssistant) -> None:
+    """A full buffer drops the oldest events."""
+    history = GimdowEventHistory(hass, "entry")
+    history.async_add(
+        "lock",
+        [
+            LockEvent(index * 60_000, "unlock_card", index, EVENT_SOURCE_LOG)
+            for index in range(HISTORY_MAX_EVENTS + 10)
+        ],
+    )
+
+    events = history.get("lock")
+    assert len(events) == HISTORY_MAX_EVENTS
+    assert events[-1].value == 10
@@ -0,0 +1,62 @@
+"""Tests for the MQ device listener."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import Any
+
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from tuya_sharing import CustomerDevice
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.gimdow import DeviceListener
+from custom_components.gimdow.const import MQ_UPDATE_COALESCE_WINDOW
+from custom_components.gimdow.history import EVENT_SOURCE_MQ, GimdowEventHistory
+from custom_components.gimdow.metrics import GimdowMetrics
+
+
+def report(*status: dict[str, Any]) -> dict[str, Any]:
+    """Return the MQ message of a status report of the lock."""
+    return {"protocol": 4, "data": {"devId": "lock", "status": list(status)}}
+
+
+async def test_repeated_access_events_are_recorded(hass: HomeAssistant) -> None:
+    """Every reported access DP is an event, even with an unchanged value."""
+    manager = SimpleNamespace(
+        device_map={
+            "lock": CustomerDevice(
+                id="lock",
+                name="Lock",
+                category="jtmspro",
+                product_id="product",
+                product_name="Lock",
+                online=True,
+                status={"unlock_card": 1},
+            )
+        }
+    )
+    coordinator = SimpleNamespace(
+        history=GimdowEventHistory(hass, "entry"),
+        async_handle_device_updates=lambda device_ids: None,
+    )
+    listener = DeviceListener(hass, manager, coordinator, GimdowMetrics())
+
+    listener.on_message(report({"code": "unlock_card", "value": 1}))
+    listener.on_message(report({"code": "unlock_card", "value": 1}))
+    listener.on_message(report({"code": "lock_motor_state", "value": True}))
+    listener.on_message({"protocol": 20, "data": {"devId": "lock"}})
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=MQ_UPDATE_COALESCE_WINDOW + 1)
+    )
+    await hass.async_block_till_done()
+
+    events = coordinator.history.get("lock")
+    assert [(event.event, event.value) for event in events] == [
+        ("unlock_card", 1),
+        ("unlock_card", 1),
+    ]
+    assert all(event.source == EVENT_SOURCE_MQ for event in events)
+    listener.async_shutdown()
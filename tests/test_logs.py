@@ -0,0 +1,70 @@
+"""Tests for reducing lock logs to a lock state."""
+
+from __future__ import annotations
+
+from custom_components.gimdow.logs import LockLogReducer
+
+
+def test_newest_event_decides() -> None:
+    """The newest decisive entry of a newest-first page decides the state."""
+    reducer = LockLogReducer(None)
+    assert reducer.feed(
+        [
+            {"type": "battery_low", "time": 400},
+            {"type": "unlock_fingerprint", "time": 300},
+            {"type": "lock_record", "time": 200},
+        ]
+    )
+    assert reducer.is_locked is False
+    assert reducer.latest_entry == {"type": "unlock_fingerprint", "time": 300}
+    assert reducer.newest_timestamp == 400
+
+
+def test_priority_breaks_ties() -> None:
+    """Events with the same time are decided by their priority."""
+    reducer = LockLogReducer(None)
+    reducer.feed(
+        [
+            {"type": "unlock_app", "time": 100},
+            {"type": "lock_record", "time": 100},
+        ]
+    )
+    assert reducer.is_locked is True
+
+
+def test_unordered_page_is_read_in_full() -> None:
+    """A page that is not newest first cannot stop at the first older entry."""
+    reducer = LockLogReducer(None)
+    reducer.feed(
+        [
+            {"type": "lock_record", "time": 100},
+            {"type": "battery_low", "time": 50},
+            {"type": "unlock_key", "time": 200},
+        ]
+    )
+    assert reducer.is_locked is False
+    assert reducer.newest_timestamp == 200
+
+
+def test_undecided_page_asks_for_the_next() -> None:
+    """Pages without a decisive entry do not decide the state."""
+    reducer = LockLogReducer(500)
+    assert not reducer.feed([{"type": "battery_low", "time": 600}])
+    assert reducer.is_locked is None
+    assert reducer.newest_timestamp == 600
+    assert reducer.feed([{"code": "lock_motor_state", "value": "true", "time": 550}])
+    assert reducer.is_locked is True
+    assert reducer.newest_timestamp == 600
+
+
+def test_access_events_of_all_fed_pages() -> None:
+    """Every decisive entry of a fed page is kept for the history."""
+    reducer = LockLogReducer(None)
+    reducer.feed(
+        [
+            {"type": "lock_record", "time": 300},
+            {"type": "battery_low", "time": 200},
+            {"type": "unlock_card", "time": 100},
+        ]
+    )
+    assert [log["type"] for log in reducer.events] == ["lock_record", "unlock_card"]
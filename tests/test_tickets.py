@@ -0,0 +1,124 @@
+"""Tests for the password ticket cache."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from types import SimpleNamespace
+from typing import Any
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.gimdow.api import GimdowApiGateway
+from custom_components.gimdow.const import TICKET_ACTIVE_WINDOW, TICKET_REFRESH_MARGIN
+from custom_components.gimdow.metrics import GimdowMetrics
+from custom_components.gimdow.tickets import PasswordTicketCache
+
+TICKET_LIFETIME = TICKET_REFRESH_MARGIN + 30
+
+
+class TicketApi:
+    """Customer API handing out numbered password tickets."""
+
+    def __init__(self) -> None:
+        """Initialize the API."""
+        self.calls = 0
+
+    def post(
+        self,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Answer a password ticket request."""
+        self.calls += 1
+        return {
+            "success": True,
+            "result": {
+                "ticket_id": f"ticket{self.calls}",
+                "expire_time": TICKET_LIFETIME,
+            },
+        }
+
+
+@pytest.fixture
+def api() -> TicketApi:
+    """Return the customer API of the account."""
+    return TicketApi()
+
+
+@pytest.fixture
+def manager(api: TicketApi) -> SimpleNamespace:
+    """Return the manager of an account with one online lock."""
+    return SimpleNamespace(
+        customer_api=api, device_map={"lock": SimpleNamespace(online=True)}
+    )
+
+
+@pytest.fixture
+async def tickets(
+    hass: HomeAssistant, manager: SimpleNamespace
+) -> AsyncIterator[PasswordTicketCache]:
+    """Return the ticket cache of the account."""
+    gateway = GimdowApiGateway(hass, manager, "account", GimdowMetrics())
+    cache = PasswordTicketCache(hass, manager, gateway)
+    yield cache
+    cache.async_shutdown()
+    gateway.async_shutdown()
+
+
+async def test_ticket_is_taken_once(tickets: PasswordTicketCache) -> None:
+    """A prefetched ticket is used by one command only."""
+    await tickets.async_prefetch("lock")
+    ticket = tickets.take("lock")
+    assert ticket is not None
+    assert ticket.ticket_id == "ticket1"
+    assert tickets.take("lock") is None
+
+
+async def test_cached_ticket_is_not_fetched_again(
+    tickets: PasswordTicketCache, api: TicketApi
+) -> None:
+    """Using a lock again keeps the ticket that is still unused."""
+    await tickets.async_prefetch("lock")
+    await tickets.async_prefetch("lock")
+    assert api.calls == 1
+
+
+async def test_offline_lock_gets_no_ticket(
+    tickets: PasswordTicketCache, manager: SimpleNamespace, api: TicketApi
+) -> None:
+    """No ticket is fetched for an offline lock."""
+    manager.device_map["lock"].online = False
+    await tickets.async_prefetch("lock")
+    assert api.calls == 0
+    assert tickets.take("lock") is None
+
+
+async def test_ticket_is_refreshed_while_the_lock_is_used(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    tickets: PasswordTicketCache,
+    api: TicketApi,
+) -> None:
+    """The ticket is replaced before it expires, until the lock goes idle."""
+    await tickets.async_prefetch("lock")
+
+    freezer.tick(TICKET_LIFETIME - TICKET_REFRESH_MARGIN)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert api.calls == 2
+    ticket = tickets.take("lock")
+    assert ticket is not None
+    assert ticket.ticket_id == "ticket2"
+    await tickets.async_prefetch("lock")
+    assert api.calls == 3
+
+    freezer.tick(TICKET_ACTIVE_WINDOW)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert api.calls == 3
+    assert tickets.take("lock") is None